@@ -11,6 +11,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+import os
 import sys
 import pathlib
 from dotenv import load_dotenv
@@ -96,7 +97,9 @@ def construct_society(question: str) -> RolePlaying:
         ).get_tools(),
         *VideoAnalysisToolkit(model=models["video"]).get_tools(),
         *AudioAnalysisToolkit().get_tools(),  # This requires OpenAI Key
-        *CodeExecutionToolkit(sandbox="subprocess", verbose=True).get_tools(),
+        *CodeExecutionToolkit(
+            sandbox="subprocess", verbose=os.getenv("OWL_CODE_VERBOSE", "0") == "1"
+        ).get_tools(),
         *ImageAnalysisToolkit(model=models["image"]).get_tools(),
         SearchToolkit().search_duckduckgo,
         SearchToolkit().search_google,  # Comment this out if you don't have google search
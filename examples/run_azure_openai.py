@@ -71,7 +71,9 @@ def construct_society(question: str) -> OwlRolePlaying:
             web_agent_model=models["browsing"],
             planning_agent_model=models["planning"],
         ).get_tools(),
-        *CodeExecutionToolkit(sandbox="subprocess", verbose=True).get_tools(),
+        *CodeExecutionToolkit(
+            sandbox="subprocess", verbose=os.getenv("OWL_CODE_VERBOSE", "0") == "1"
+        ).get_tools(),
         *ImageAnalysisToolkit(model=models["image"]).get_tools(),
         SearchToolkit().search_duckduckgo,
         SearchToolkit().search_google,  # Comment this out if you don't have google search
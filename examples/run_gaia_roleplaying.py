@@ -104,7 +104,9 @@ def main():
             model=models["video"]
         ).get_tools(),  # This requires OpenAI Key
         *AudioAnalysisToolkit().get_tools(),  # This requires OpenAI Key
-        *CodeExecutionToolkit(sandbox="subprocess", verbose=True).get_tools(),
+        *CodeExecutionToolkit(
+            sandbox="subprocess", verbose=os.getenv("OWL_CODE_VERBOSE", "0") == "1"
+        ).get_tools(),
         *ImageAnalysisToolkit(model=models["image"]).get_tools(),
         *SearchToolkit().get_tools(),
         *ExcelToolkit().get_tools(),
@@ -26,6 +26,7 @@ To use this module:
 3. Run with: python -m examples.run_groq
 """
 
+import os
 import sys
 from dotenv import load_dotenv
 from camel.models import ModelFactory
@@ -107,7 +108,9 @@ def construct_society(question: str) -> OwlRolePlaying:
         ).get_tools(),
         *VideoAnalysisToolkit(model=models["video"]).get_tools(),
         *AudioAnalysisToolkit().get_tools(),  # This requires OpenAI Key
-        *CodeExecutionToolkit(sandbox="subprocess", verbose=True).get_tools(),
+        *CodeExecutionToolkit(
+            sandbox="subprocess", verbose=os.getenv("OWL_CODE_VERBOSE", "0") == "1"
+        ).get_tools(),
         *ImageAnalysisToolkit(model=models["image"]).get_tools(),
         SearchToolkit().search_duckduckgo,
         SearchToolkit().search_google,  # Comment this out if you don't have google search
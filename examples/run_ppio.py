@@ -17,6 +17,7 @@
 # You can obtain your API key from PPIO platform: https://ppinfra.com/settings/key-management?utm_source=github_owl
 # Set it as PPIO_API_KEY="your-api-key" in your .env file or add it to your environment variables
 
+import os
 import sys
 from dotenv import load_dotenv
 
@@ -68,7 +69,9 @@ def construct_society(question: str) -> RolePlaying:
 
     # Configure toolkits
     tools = [
-        *CodeExecutionToolkit(sandbox="subprocess", verbose=True).get_tools(),
+        *CodeExecutionToolkit(
+            sandbox="subprocess", verbose=os.getenv("OWL_CODE_VERBOSE", "0") == "1"
+        ).get_tools(),
         SearchToolkit().search_duckduckgo,
         SearchToolkit().search_wiki,
         SearchToolkit().search_baidu,
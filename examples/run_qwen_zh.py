@@ -16,6 +16,7 @@
 # You can obtain your API key from Bailian platform: bailian.console.aliyun.com
 # Set it as QWEN_API_KEY="your-api-key" in your .env file or add it to your environment variables
 
+import os
 import sys
 from dotenv import load_dotenv
 from camel.models import ModelFactory
@@ -104,7 +105,9 @@ def construct_society(question: str) -> RolePlaying:
             output_language="Chinese",
         ).get_tools(),
         *VideoAnalysisToolkit(model=models["video"]).get_tools(),
-        *CodeExecutionToolkit(sandbox="subprocess", verbose=True).get_tools(),
+        *CodeExecutionToolkit(
+            sandbox="subprocess", verbose=os.getenv("OWL_CODE_VERBOSE", "0") == "1"
+        ).get_tools(),
         *ImageAnalysisToolkit(model=models["image"]).get_tools(),
         SearchToolkit().search_duckduckgo,
         SearchToolkit().search_google,  # Comment this out if you don't have google search
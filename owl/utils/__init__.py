@@ -16,8 +16,10 @@ from .common import extract_pattern
 from .enhanced_role_playing import (
     OwlRolePlaying,
     OwlGAIARolePlaying,
+    OwlResponseCache,
     run_society,
     arun_society,
+    arun_societies,
 )
 from .gaia import GAIABenchmark
 from .document_toolkit import DocumentProcessingToolkit
@@ -26,8 +28,10 @@ __all__ = [
     "extract_pattern",
     "OwlRolePlaying",
     "OwlGAIARolePlaying",
+    "OwlResponseCache",
     "run_society",
     "arun_society",
+    "arun_societies",
     "GAIABenchmark",
     "DocumentProcessingToolkit",
 ]
@@ -23,7 +23,8 @@ from chunkr_ai import Chunkr
 import requests
 import mimetypes
 import json
-from typing import List, Optional, Tuple, Literal
+from copy import deepcopy
+from typing import Any, Callable, Dict, List, Optional, Tuple, Literal
 from urllib.parse import urlparse
 import os
 import subprocess
@@ -35,6 +36,29 @@ nest_asyncio.apply()
 
 logger = get_logger(__name__)
 
+# OpenAI tool schemas keyed by the underlying function, shared by all
+# toolkit instances in the process.
+_TOOL_SCHEMA_CACHE: Dict[Callable, Dict[str, Any]] = {}
+
+
+def _cached_function_tool(method: Callable) -> FunctionTool:
+    r"""Build a FunctionTool, reusing the schema generated for the same
+    function on an earlier call instead of re-inspecting its signature.
+
+    Args:
+        method (Callable): The (possibly bound) method to wrap.
+
+    Returns:
+        FunctionTool: The tool wrapping :obj:`method`.
+    """
+    func = getattr(method, "__func__", method)
+    schema = _TOOL_SCHEMA_CACHE.get(func)
+    if schema is None:
+        tool = FunctionTool(method)
+        _TOOL_SCHEMA_CACHE[func] = deepcopy(tool.get_openai_tool_schema())
+        return tool
+    return FunctionTool(method, openai_tool_schema=deepcopy(schema))
+
 
 class DocumentProcessingToolkit(BaseToolkit):
     r"""A class representing a toolkit for processing document and return the content of the document.
@@ -285,5 +309,5 @@ class DocumentProcessingToolkit(BaseToolkit):
             List[FunctionTool]: A list of FunctionTool objects representing the functions in the toolkit.
         """
         return [
-            FunctionTool(self.extract_document_content),
+            _cached_function_tool(self.extract_document_content),
         ]  # Added closing triple quotes here
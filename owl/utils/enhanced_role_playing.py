@@ -13,6 +13,10 @@
 # ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
 
 from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
 import threading
 
 
@@ -21,15 +25,186 @@ from camel.responses import ChatAgentResponse
 from camel.messages.base import BaseMessage
 from camel.societies import RolePlaying
 from camel.logger import get_logger
+from camel.types import OpenAIBackendRole
 
 
-from copy import deepcopy
+from copy import copy
 
 logger = get_logger(__name__)
 
+# Reply of the user agent that ends a conversation, and the markers accepted
+# by `arun_society`, which also stops on the Chinese phrasing
+_TASK_DONE = "TASK_DONE"
+_TERMINATION_MARKERS = (_TASK_DONE, "任务已完成")
+
+# The task is kept at the very end of both prompts so that the rules above it
+# form a byte-identical prefix across tasks, which lets providers reuse their
+# prompt cache between societies.
+_USER_SYS_PROMPT_TEMPLATE = """
+===== RULES OF USER =====
+Never forget you are a user and I am a assistant. Never flip roles! You will always instruct me. We share a common interest in collaborating to successfully complete a task.
+I must help you to complete a difficult task.
+You must instruct me based on my expertise and your needs to solve the task step by step. The format of your instruction is: `Instruction: [YOUR INSTRUCTION]`, where "Instruction" describes a sub-task or question.
+You must give me one instruction at a time.
+I must write a response that appropriately solves the requested instruction.
+You should instruct me not ask me questions.
+
+Please note that the task may be very complicated. Do not attempt to solve the task by single step. You must instruct me to find the answer step by step.
+Here are some tips that will help you to give more valuable instructions about our task to me:
+<tips>
+- I have various tools to use, such as search toolkit, web browser simulation toolkit, document relevant toolkit, code execution toolkit, etc. Thus, You must think how human will solve the task step-by-step, and give me instructions just like that. For example, one may first use google search to get some initial information and the target url, then retrieve the content of the url, or do some web browser interaction to find the answer.
+- Although the task is complex, the answer does exist. If you can't find the answer using the current scheme, try to re-plan and use other ways to find the answer, e.g. using other tools or methods that can achieve similar results.
+- Always remind me to verify my final answer about the overall task. This work can be done by using multiple tools(e.g., screenshots, webpage analysis, etc.), or something else.
+- If I have written code, please remind me to run the code and get the result.
+- Search results typically do not provide precise answers. It is not likely to find the answer directly using search toolkit only, the search query should be concise and focuses on finding sources rather than direct answers, as it always need to use other tools to further process the url, e.g. interact with the webpage, extract webpage content, etc. 
+- If the question mentions youtube video, in most cases you have to process the content of the mentioned video.
+- For downloading files, you can either use the web browser simulation toolkit or write codes (for example, the github content can be downloaded via https://raw.githubusercontent.com/...).
+- Flexibly write codes to solve some problems, such as excel relevant tasks.
+</tips>
+
+Now you must start to instruct me to solve the task step-by-step. Do not add anything else other than your instruction!
+Keep giving me instructions until you think the task is completed.
+When the task is completed, you must only reply with a single word <TASK_DONE>.
+Never say <TASK_DONE> unless my responses have solved your task.
+
+Now, here is the overall task: <task>{task_prompt}</task>. Never forget our task!
+        """
+
+_ASSISTANT_SYS_PROMPT_TEMPLATE = """
+===== RULES OF ASSISTANT =====
+Never forget you are a assistant and I am a user. Never flip roles! Never instruct me! You have to utilize your available tools to solve the task I assigned.
+We share a common interest in collaborating to successfully complete a complex task.
+You must help me to complete the task.
+
+I must instruct you based on your expertise and my needs to complete the task. An instruction is typically a sub-task or question.
+
+You must leverage your available tools, try your best to solve the problem, and explain your solutions.
+Unless I say the task is completed, you should always start with:
+Solution: [YOUR_SOLUTION]
+[YOUR_SOLUTION] should be specific, including detailed explanations and provide preferable detailed implementations and examples and lists for task-solving.
+
+Please note that our overall task may be very complicated. Here are some tips that may help you solve the task:
+<tips>
+- If one way fails to provide an answer, try other ways or methods. The answer does exists.
+- If the search snippet is unhelpful but the URL comes from an authoritative source, try visit the website for more details.  
+- When looking for specific numerical values (e.g., dollar amounts), prioritize reliable sources and avoid relying only on search snippets.  
+- When solving tasks that require web searches, check Wikipedia first before exploring other websites.  
+- When trying to solve math problems, you can try to write python code and use sympy library to solve the problem.
+- Always verify the accuracy of your final answers! Try cross-checking the answers by other ways. (e.g., screenshots, webpage analysis, etc.).  
+- Do not be overly confident in your own knowledge. Searching can provide a broader perspective and help validate existing knowledge.  
+- After writing codes, do not forget to run the code and get the result. If it encounters an error, try to debug it. Also, bear in mind that the code execution environment does not support interactive input.
+- When a tool fails to run, or the code does not run correctly, never assume that it returns the correct result and continue to reason based on the assumption, because the assumed result cannot lead you to the correct answer. The right way is to think about the reason for the error and try again.
+- Search results typically do not provide precise answers. It is not likely to find the answer directly using search toolkit only, the search query should be concise and focuses on finding sources rather than direct answers, as it always need to use other tools to further process the url, e.g. interact with the webpage, extract webpage content, etc. 
+- For downloading files, you can either use the web browser simulation toolkit or write codes.
+</tips>
+
+Here is our overall task: {task_prompt}. Never forget our task!
+        """
+
+
+# Suffixes appended to the messages exchanged between the agents every turn,
+# filled in with the task via `format_map`
+_USER_TURN_SUFFIX_TEMPLATE = """\n
+            Here are auxiliary information about the overall task, which may help you understand the intent of the current task:
+            <auxiliary_information>
+            {task_prompt}
+            </auxiliary_information>
+            If there are available tools and you want to call them, never say 'I will ...', but first call the tool and reply based on tool call's result, and tell me which tool you have called.
+            """
+
+_FINAL_ANSWER_SUFFIX_TEMPLATE = """\n
+            Now please make a final answer of the original task based on our conversation : <task>{task_prompt}</task>
+            """
+
+_GAIA_FINAL_ANSWER_SUFFIX_TEMPLATE = """\n
+            Now please make a final answer of the original task based on our conversation : <task>{task_prompt}</task>
+            Please pay special attention to the format in which the answer is presented.
+            You should first analyze the answer format required by the question and then output the final answer that meets the format requirements. 
+            Your response should include the following content:
+            - `analysis`: enclosed by <analysis> </analysis>, a detailed analysis of the reasoning result.
+            - `final_answer`: enclosed by <final_answer> </final_answer>, the final answer to the question.
+            Here are some hint about the final answer:
+            <hint>
+            Your final answer must be output exactly in the format specified by the question. It should be a number OR as few words as possible OR a comma separated list of numbers and/or strings:
+            - If you are asked for a number, don't use comma to write your number neither use units such as $ or percent sign unless specified otherwise. 
+            - If you are asked for a string, don't use articles, neither abbreviations (e.g. for cities), and write the digits in plain text unless specified otherwise. 
+            - If you are asked for a comma separated list, apply the above rules depending of whether the element to be put in the list is a number or a string.
+            </hint>
+            """
+
+_ASSISTANT_TURN_SUFFIX_TEMPLATE = """\n
+                Provide me with the next instruction and input (if needed) based on my response and our current task: <task>{task_prompt}</task>
+                Before producing the final answer, please check whether I have rechecked the final answer using different toolkit as much as possible. If not, please remind me to do that.
+                If I have written codes, remind me to run the codes.
+                If you think our task is done, reply with `TASK_DONE` to end our conversation.
+            """
+
+# First message of every society, sent to the user agent
+_INIT_PROMPT = """
+    Now please give me instructions to solve over overall task step by step. If the task requires some specific knowledge, please instruct me to use tools to complete the task.
+        """
+
+
+class OwlResponseCache:
+    r"""Exact-match cache of agent responses, shared between societies.
+
+    A response is keyed on the agent's model, its full memory context and the
+    incoming message, so a hit only happens when the model would have been
+    sent a byte-identical request, e.g. the opening instruction of a task
+    that is run again. Responses that requested tool calls are never cached,
+    since replaying them would skip the tool side effects.
+
+    Args:
+        max_size (int): Maximum number of responses kept, the least recently
+            used entry is evicted first. (default: :obj:`256`)
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, ChatAgentResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(agent: ChatAgent, input_message: BaseMessage) -> str:
+        r"""Build the cache key of a request from the agent state and input."""
+        context, _ = agent.memory.get_context()
+        payload = json.dumps(
+            [
+                str(agent.model_backend.model_type),
+                context,
+                input_message.content,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[ChatAgentResponse]:
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: str, response: ChatAgentResponse) -> None:
+        if response.terminated or not response.msgs or response.info.get("tool_calls"):
+            return
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
 
 class OwlRolePlaying(RolePlaying):
     def __init__(self, **kwargs):
+        # Optional response cache, only consulted by `astep`
+        self.response_cache: Optional[OwlResponseCache] = kwargs.pop(
+            "response_cache", None
+        )
+
         self.user_role_name = kwargs.get("user_role_name", "user")
         self.assistant_role_name = kwargs.get("assistant_role_name", "assistant")
 
@@ -141,67 +316,9 @@ class OwlRolePlaying(RolePlaying):
     #         return False
 
     def _construct_gaia_sys_msgs(self):
-        user_system_prompt = f"""
-===== RULES OF USER =====
-Never forget you are a user and I am a assistant. Never flip roles! You will always instruct me. We share a common interest in collaborating to successfully complete a task.
-I must help you to complete a difficult task.
-You must instruct me based on my expertise and your needs to solve the task step by step. The format of your instruction is: `Instruction: [YOUR INSTRUCTION]`, where "Instruction" describes a sub-task or question.
-You must give me one instruction at a time.
-I must write a response that appropriately solves the requested instruction.
-You should instruct me not ask me questions.
-
-Please note that the task may be very complicated. Do not attempt to solve the task by single step. You must instruct me to find the answer step by step.
-Here are some tips that will help you to give more valuable instructions about our task to me:
-<tips>
-- I have various tools to use, such as search toolkit, web browser simulation toolkit, document relevant toolkit, code execution toolkit, etc. Thus, You must think how human will solve the task step-by-step, and give me instructions just like that. For example, one may first use google search to get some initial information and the target url, then retrieve the content of the url, or do some web browser interaction to find the answer.
-- Although the task is complex, the answer does exist. If you can't find the answer using the current scheme, try to re-plan and use other ways to find the answer, e.g. using other tools or methods that can achieve similar results.
-- Always remind me to verify my final answer about the overall task. This work can be done by using multiple tools(e.g., screenshots, webpage analysis, etc.), or something else.
-- If I have written code, please remind me to run the code and get the result.
-- Search results typically do not provide precise answers. It is not likely to find the answer directly using search toolkit only, the search query should be concise and focuses on finding sources rather than direct answers, as it always need to use other tools to further process the url, e.g. interact with the webpage, extract webpage content, etc. 
-- If the question mentions youtube video, in most cases you have to process the content of the mentioned video.
-- For downloading files, you can either use the web browser simulation toolkit or write codes (for example, the github content can be downloaded via https://raw.githubusercontent.com/...).
-- Flexibly write codes to solve some problems, such as excel relevant tasks.
-</tips>
-
-Now, here is the overall task: <task>{self.task_prompt}</task>. Never forget our task!
-
-Now you must start to instruct me to solve the task step-by-step. Do not add anything else other than your instruction!
-Keep giving me instructions until you think the task is completed.
-When the task is completed, you must only reply with a single word <TASK_DONE>.
-Never say <TASK_DONE> unless my responses have solved your task.
-        """
-
-        assistant_system_prompt = f"""
-===== RULES OF ASSISTANT =====
-Never forget you are a assistant and I am a user. Never flip roles! Never instruct me! You have to utilize your available tools to solve the task I assigned.
-We share a common interest in collaborating to successfully complete a complex task.
-You must help me to complete the task.
-
-Here is our overall task: {self.task_prompt}. Never forget our task!
-
-I must instruct you based on your expertise and my needs to complete the task. An instruction is typically a sub-task or question.
-
-You must leverage your available tools, try your best to solve the problem, and explain your solutions.
-Unless I say the task is completed, you should always start with:
-Solution: [YOUR_SOLUTION]
-[YOUR_SOLUTION] should be specific, including detailed explanations and provide preferable detailed implementations and examples and lists for task-solving.
-
-Please note that our overall task may be very complicated. Here are some tips that may help you solve the task:
-<tips>
-- If one way fails to provide an answer, try other ways or methods. The answer does exists.
-- If the search snippet is unhelpful but the URL comes from an authoritative source, try visit the website for more details.  
-- When looking for specific numerical values (e.g., dollar amounts), prioritize reliable sources and avoid relying only on search snippets.  
-- When solving tasks that require web searches, check Wikipedia first before exploring other websites.  
-- When trying to solve math problems, you can try to write python code and use sympy library to solve the problem.
-- Always verify the accuracy of your final answers! Try cross-checking the answers by other ways. (e.g., screenshots, webpage analysis, etc.).  
-- Do not be overly confident in your own knowledge. Searching can provide a broader perspective and help validate existing knowledge.  
-- After writing codes, do not forget to run the code and get the result. If it encounters an error, try to debug it. Also, bear in mind that the code execution environment does not support interactive input.
-- When a tool fails to run, or the code does not run correctly, never assume that it returns the correct result and continue to reason based on the assumption, because the assumed result cannot lead you to the correct answer. The right way is to think about the reason for the error and try again.
-- Search results typically do not provide precise answers. It is not likely to find the answer directly using search toolkit only, the search query should be concise and focuses on finding sources rather than direct answers, as it always need to use other tools to further process the url, e.g. interact with the webpage, extract webpage content, etc. 
-- For downloading files, you can either use the web browser simulation toolkit or write codes.
-</tips>
-
-        """
+        format_args = {"task_prompt": self.task_prompt}
+        user_system_prompt = _USER_SYS_PROMPT_TEMPLATE.format_map(format_args)
+        assistant_system_prompt = _ASSISTANT_SYS_PROMPT_TEMPLATE.format_map(format_args)
 
         user_sys_msg = BaseMessage.make_user_message(
             role_name=self.user_role_name, content=user_system_prompt
@@ -228,22 +345,20 @@ Please note that our overall task may be very complicated. Here are some tips th
             )
         user_msg = self._reduce_message_options(user_response.msgs)
 
-        modified_user_msg = deepcopy(user_msg)
+        modified_user_msg = copy(user_msg)
+        task_done = _TASK_DONE in user_msg.content
+        format_args = {"task_prompt": self.task_prompt}
 
-        if "TASK_DONE" not in user_msg.content:
-            modified_user_msg.content += f"""\n
-            Here are auxiliary information about the overall task, which may help you understand the intent of the current task:
-            <auxiliary_information>
-            {self.task_prompt}
-            </auxiliary_information>
-            If there are available tools and you want to call them, never say 'I will ...', but first call the tool and reply based on tool call's result, and tell me which tool you have called.
-            """
+        if not task_done:
+            modified_user_msg.content += _USER_TURN_SUFFIX_TEMPLATE.format_map(
+                format_args
+            )
 
         else:
             # The task is done, and the assistant agent need to give the final answer about the original task
-            modified_user_msg.content += f"""\n
-            Now please make a final answer of the original task based on our conversation : <task>{self.task_prompt}</task>
-            """
+            modified_user_msg.content += _FINAL_ANSWER_SUFFIX_TEMPLATE.format_map(
+                format_args
+            )
 
         # process assistant's response
         assistant_response = self.assistant_agent.step(modified_user_msg)
@@ -260,14 +375,11 @@ Please note that our overall task may be very complicated. Here are some tips th
             )
         assistant_msg = self._reduce_message_options(assistant_response.msgs)
 
-        modified_assistant_msg = deepcopy(assistant_msg)
-        if "TASK_DONE" not in user_msg.content:
-            modified_assistant_msg.content += f"""\n
-                Provide me with the next instruction and input (if needed) based on my response and our current task: <task>{self.task_prompt}</task>
-                Before producing the final answer, please check whether I have rechecked the final answer using different toolkit as much as possible. If not, please remind me to do that.
-                If I have written codes, remind me to run the codes.
-                If you think our task is done, reply with `TASK_DONE` to end our conversation.
-            """
+        modified_assistant_msg = copy(assistant_msg)
+        if not task_done:
+            modified_assistant_msg.content += (
+                _ASSISTANT_TURN_SUFFIX_TEMPLATE.format_map(format_args)
+            )
 
         # return the modified messages
         return (
@@ -283,10 +395,46 @@ Please note that our overall task may be very complicated. Here are some tips th
             ),
         )
 
+    async def _cached_astep(
+        self, agent: ChatAgent, input_message: BaseMessage
+    ) -> ChatAgentResponse:
+        r"""Run `agent.astep`, answering from the response cache when an
+        identical request has been seen before."""
+        if self.response_cache is None:
+            return await agent.astep(input_message)
+
+        key = self.response_cache.make_key(agent, input_message)
+        cached = self.response_cache.get(key)
+        if cached is None:
+            response = await agent.astep(input_message)
+            self.response_cache.put(key, response)
+            return response
+
+        # Replay the exchange into memory as if the model had been called
+        agent.update_memory(input_message, OpenAIBackendRole.USER)
+        agent.update_memory(cached.msgs[0], OpenAIBackendRole.ASSISTANT)
+        logger.info(f"Response cache hit for {agent.role_name}")
+        return ChatAgentResponse(
+            msgs=list(cached.msgs),
+            terminated=cached.terminated,
+            info={
+                **cached.info,
+                "usage": {
+                    "completion_tokens": 0,
+                    "prompt_tokens": 0,
+                    "total_tokens": 0,
+                },
+                "cached_response": True,
+            },
+        )
+
     async def astep(
         self, assistant_msg: BaseMessage
     ) -> Tuple[ChatAgentResponse, ChatAgentResponse]:
-        user_response = await self.user_agent.astep(assistant_msg)
+        cached_astep = self._cached_astep
+        reduce_message_options = self._reduce_message_options
+
+        user_response = await cached_astep(self.user_agent, assistant_msg)
         if user_response.terminated or user_response.msgs is None:
             return (
                 ChatAgentResponse(msgs=[], terminated=False, info={}),
@@ -296,26 +444,24 @@ Please note that our overall task may be very complicated. Here are some tips th
                     info=user_response.info,
                 ),
             )
-        user_msg = self._reduce_message_options(user_response.msgs)
+        user_msg = reduce_message_options(user_response.msgs)
 
-        modified_user_msg = deepcopy(user_msg)
+        modified_user_msg = copy(user_msg)
+        task_done = _TASK_DONE in user_msg.content
+        format_args = {"task_prompt": self.task_prompt}
 
-        if "TASK_DONE" not in user_msg.content:
-            modified_user_msg.content += f"""\n
-            Here are auxiliary information about the overall task, which may help you understand the intent of the current task:
-            <auxiliary_information>
-            {self.task_prompt}
-            </auxiliary_information>
-            If there are available tools and you want to call them, never say 'I will ...', but first call the tool and reply based on tool call's result, and tell me which tool you have called.
-            """
+        if not task_done:
+            modified_user_msg.content += _USER_TURN_SUFFIX_TEMPLATE.format_map(
+                format_args
+            )
 
         else:
             # The task is done, and the assistant agent need to give the final answer about the original task
-            modified_user_msg.content += f"""\n
-            Now please make a final answer of the original task based on our conversation : <task>{self.task_prompt}</task>
-            """
+            modified_user_msg.content += _FINAL_ANSWER_SUFFIX_TEMPLATE.format_map(
+                format_args
+            )
 
-        assistant_response = await self.assistant_agent.astep(modified_user_msg)
+        assistant_response = await cached_astep(self.assistant_agent, modified_user_msg)
         if assistant_response.terminated or assistant_response.msgs is None:
             return (
                 ChatAgentResponse(
@@ -327,16 +473,7 @@ Please note that our overall task may be very complicated. Here are some tips th
                     msgs=[user_msg], terminated=False, info=user_response.info
                 ),
             )
-        assistant_msg = self._reduce_message_options(assistant_response.msgs)
-
-        modified_assistant_msg = deepcopy(assistant_msg)
-        if "TASK_DONE" not in user_msg.content:
-            modified_assistant_msg.content += f"""\n
-                Provide me with the next instruction and input (if needed) based on my response and our current task: <task>{self.task_prompt}</task>
-                Before producing the final answer, please check whether I have rechecked the final answer using different toolkit as much as possible. If not, please remind me to do that.
-                If I have written codes, remind me to run the codes.
-                If you think our task is done, reply with `TASK_DONE` to end our conversation.
-            """
+        assistant_msg = reduce_message_options(assistant_response.msgs)
 
         return (
             ChatAgentResponse(
@@ -371,34 +508,20 @@ class OwlGAIARolePlaying(OwlRolePlaying):
             )
         user_msg = self._reduce_message_options(user_response.msgs)
 
-        modified_user_msg = deepcopy(user_msg)
+        modified_user_msg = copy(user_msg)
+        task_done = _TASK_DONE in user_msg.content
+        format_args = {"task_prompt": self.task_prompt}
 
-        if "TASK_DONE" not in user_msg.content:
-            modified_user_msg.content += f"""\n
-            Here are auxiliary information about the overall task, which may help you understand the intent of the current task:
-            <auxiliary_information>
-            {self.task_prompt}
-            </auxiliary_information>
-            If there are available tools and you want to call them, never say 'I will ...', but first call the tool and reply based on tool call's result, and tell me which tool you have called.
-            """
+        if not task_done:
+            modified_user_msg.content += _USER_TURN_SUFFIX_TEMPLATE.format_map(
+                format_args
+            )
 
         else:
             # The task is done, and the assistant agent need to give the final answer about the original task
-            modified_user_msg.content += f"""\n
-            Now please make a final answer of the original task based on our conversation : <task>{self.task_prompt}</task>
-            Please pay special attention to the format in which the answer is presented.
-            You should first analyze the answer format required by the question and then output the final answer that meets the format requirements. 
-            Your response should include the following content:
-            - `analysis`: enclosed by <analysis> </analysis>, a detailed analysis of the reasoning result.
-            - `final_answer`: enclosed by <final_answer> </final_answer>, the final answer to the question.
-            Here are some hint about the final answer:
-            <hint>
-            Your final answer must be output exactly in the format specified by the question. It should be a number OR as few words as possible OR a comma separated list of numbers and/or strings:
-            - If you are asked for a number, don't use comma to write your number neither use units such as $ or percent sign unless specified otherwise. 
-            - If you are asked for a string, don't use articles, neither abbreviations (e.g. for cities), and write the digits in plain text unless specified otherwise. 
-            - If you are asked for a comma separated list, apply the above rules depending of whether the element to be put in the list is a number or a string.
-            </hint>
-            """
+            modified_user_msg.content += _GAIA_FINAL_ANSWER_SUFFIX_TEMPLATE.format_map(
+                format_args
+            )
 
         # process assistant's response
         assistant_response = self.assistant_agent.step(modified_user_msg)
@@ -415,14 +538,11 @@ class OwlGAIARolePlaying(OwlRolePlaying):
             )
         assistant_msg = self._reduce_message_options(assistant_response.msgs)
 
-        modified_assistant_msg = deepcopy(assistant_msg)
-        if "TASK_DONE" not in user_msg.content:
-            modified_assistant_msg.content += f"""\n
-                Provide me with the next instruction and input (if needed) based on my response and our current task: <task>{self.task_prompt}</task>
-                Before producing the final answer, please check whether I have rechecked the final answer using different toolkit as much as possible. If not, please remind me to do that.
-                If I have written codes, remind me to run the codes.
-                If you think our task is done, reply with `TASK_DONE` to end our conversation.
-            """
+        modified_assistant_msg = copy(assistant_msg)
+        if not task_done:
+            modified_assistant_msg.content += (
+                _ASSISTANT_TURN_SUFFIX_TEMPLATE.format_map(format_args)
+            )
 
         # return the modified messages
         return (
@@ -439,66 +559,76 @@ class OwlGAIARolePlaying(OwlRolePlaying):
         )
 
 
+def _cached_prompt_tokens(usage: dict) -> int:
+    r"""Return how many prompt tokens were served from the provider's prompt
+    cache, from either an OpenAI- or an Anthropic-style usage dict."""
+    details = usage.get("prompt_tokens_details") or {}
+    return details.get("cached_tokens") or usage.get("cache_read_input_tokens") or 0
+
+
 def run_society(
     society: OwlRolePlaying,
     round_limit: int = 15,
 ) -> Tuple[str, List[dict], dict]:
     overall_completion_token_count = 0
     overall_prompt_token_count = 0
+    overall_cached_prompt_token_count = 0
 
     chat_history = []
-    init_prompt = """
-    Now please give me instructions to solve over overall task step by step. If the task requires some specific knowledge, please instruct me to use tools to complete the task.
-        """
-    input_msg = society.init_chat(init_prompt)
+    input_msg = society.init_chat(_INIT_PROMPT)
+    step = society.step
     for _round in range(round_limit):
-        assistant_response, user_response = society.step(input_msg)
+        assistant_response, user_response = step(input_msg)
+        assistant_info = assistant_response.info
+        assistant_msg = assistant_response.msg
+        user_msg = user_response.msg
         # Check if usage info is available before accessing it
-        if assistant_response.info.get("usage") and user_response.info.get("usage"):
-            overall_completion_token_count += assistant_response.info["usage"].get(
+        assistant_usage = assistant_info.get("usage")
+        user_usage = user_response.info.get("usage")
+        if assistant_usage and user_usage:
+            overall_completion_token_count += assistant_usage.get(
                 "completion_tokens", 0
-            ) + user_response.info["usage"].get("completion_tokens", 0)
-            overall_prompt_token_count += assistant_response.info["usage"].get(
+            ) + user_usage.get("completion_tokens", 0)
+            overall_prompt_token_count += assistant_usage.get(
                 "prompt_tokens", 0
-            ) + user_response.info["usage"].get("prompt_tokens", 0)
+            ) + user_usage.get("prompt_tokens", 0)
+            overall_cached_prompt_token_count += _cached_prompt_tokens(
+                assistant_usage
+            ) + _cached_prompt_tokens(user_usage)
 
         # convert tool call to dict
-        tool_call_records: List[dict] = []
-        if assistant_response.info.get("tool_calls"):
-            for tool_call in assistant_response.info["tool_calls"]:
-                tool_call_records.append(tool_call.as_dict())
+        tool_call_records: List[dict] = [
+            tool_call.as_dict() for tool_call in assistant_info.get("tool_calls") or []
+        ]
 
         _data = {
-            "user": user_response.msg.content
-            if hasattr(user_response, "msg") and user_response.msg
-            else "",
-            "assistant": assistant_response.msg.content
-            if hasattr(assistant_response, "msg") and assistant_response.msg
-            else "",
+            "user": user_msg.content if user_msg else "",
+            "assistant": assistant_msg.content if assistant_msg else "",
             "tool_calls": tool_call_records,
         }
 
         chat_history.append(_data)
         logger.info(
-            f"Round #{_round} user_response:\n {user_response.msgs[0].content if user_response.msgs and len(user_response.msgs) > 0 else ''}"
+            f"Round #{_round} user_response:\n {user_response.msgs[0].content if user_response.msgs else ''}"
         )
         logger.info(
-            f"Round #{_round} assistant_response:\n {assistant_response.msgs[0].content if assistant_response.msgs and len(assistant_response.msgs) > 0 else ''}"
+            f"Round #{_round} assistant_response:\n {assistant_response.msgs[0].content if assistant_response.msgs else ''}"
         )
 
         if (
             assistant_response.terminated
             or user_response.terminated
-            or "TASK_DONE" in user_response.msg.content
+            or _TASK_DONE in user_msg.content
         ):
             break
 
-        input_msg = assistant_response.msg
+        input_msg = assistant_msg
 
     answer = chat_history[-1]["assistant"]
     token_info = {
         "completion_token_count": overall_completion_token_count,
         "prompt_token_count": overall_prompt_token_count,
+        "cached_prompt_token_count": overall_cached_prompt_token_count,
     }
 
     return answer, chat_history, token_info
@@ -510,62 +640,91 @@ async def arun_society(
 ) -> Tuple[str, List[dict], dict]:
     overall_completion_token_count = 0
     overall_prompt_token_count = 0
+    overall_cached_prompt_token_count = 0
 
     chat_history = []
-    init_prompt = """
-    Now please give me instructions to solve over overall task step by step. If the task requires some specific knowledge, please instruct me to use tools to complete the task.
-        """
-    input_msg = society.init_chat(init_prompt)
+    input_msg = society.init_chat(_INIT_PROMPT)
+    step = society.astep
     for _round in range(round_limit):
-        assistant_response, user_response = await society.astep(input_msg)
+        assistant_response, user_response = await step(input_msg)
+        assistant_info = assistant_response.info
+        assistant_msg = assistant_response.msg
+        user_msg = user_response.msg
         # Check if usage info is available before accessing it
-        if assistant_response.info.get("usage") and user_response.info.get("usage"):
-            overall_prompt_token_count += assistant_response.info["usage"].get(
+        assistant_usage = assistant_info.get("usage")
+        user_usage = user_response.info.get("usage")
+        if assistant_usage and user_usage:
+            overall_completion_token_count += assistant_usage.get(
                 "completion_tokens", 0
-            )
-            overall_prompt_token_count += assistant_response.info["usage"].get(
+            ) + user_usage.get("completion_tokens", 0)
+            overall_prompt_token_count += assistant_usage.get(
                 "prompt_tokens", 0
-            ) + user_response.info["usage"].get("prompt_tokens", 0)
+            ) + user_usage.get("prompt_tokens", 0)
+            overall_cached_prompt_token_count += _cached_prompt_tokens(
+                assistant_usage
+            ) + _cached_prompt_tokens(user_usage)
 
         # convert tool call to dict
-        tool_call_records: List[dict] = []
-        if assistant_response.info.get("tool_calls"):
-            for tool_call in assistant_response.info["tool_calls"]:
-                tool_call_records.append(tool_call.as_dict())
+        tool_call_records: List[dict] = [
+            tool_call.as_dict() for tool_call in assistant_info.get("tool_calls") or []
+        ]
 
         _data = {
-            "user": user_response.msg.content
-            if hasattr(user_response, "msg") and user_response.msg
-            else "",
-            "assistant": assistant_response.msg.content
-            if hasattr(assistant_response, "msg") and assistant_response.msg
-            else "",
+            "user": user_msg.content if user_msg else "",
+            "assistant": assistant_msg.content if assistant_msg else "",
             "tool_calls": tool_call_records,
         }
 
         chat_history.append(_data)
         logger.info(
-            f"Round #{_round} user_response:\n {user_response.msgs[0].content if user_response.msgs and len(user_response.msgs) > 0 else ''}"
+            f"Round #{_round} user_response:\n {user_response.msgs[0].content if user_response.msgs else ''}"
         )
         logger.info(
-            f"Round #{_round} assistant_response:\n {assistant_response.msgs[0].content if assistant_response.msgs and len(assistant_response.msgs) > 0 else ''}"
+            f"Round #{_round} assistant_response:\n {assistant_response.msgs[0].content if assistant_response.msgs else ''}"
         )
 
         # Check other termination conditions
         if (
             assistant_response.terminated
             or user_response.terminated
-            or "TASK_DONE" in user_response.msg.content
-            or "任务已完成" in user_response.msg.content
+            or any(marker in user_msg.content for marker in _TERMINATION_MARKERS)
         ):
             break
 
-        input_msg = assistant_response.msg
+        input_msg = assistant_msg
 
     answer = chat_history[-1]["assistant"]
     token_info = {
         "completion_token_count": overall_completion_token_count,
         "prompt_token_count": overall_prompt_token_count,
+        "cached_prompt_token_count": overall_cached_prompt_token_count,
     }
 
     return answer, chat_history, token_info
+
+
+async def arun_societies(
+    societies: List[OwlRolePlaying],
+    round_limit: int = 15,
+    concurrency: int = 4,
+) -> List[Tuple[str, List[dict], dict]]:
+    r"""Run several societies concurrently on the current event loop.
+
+    Args:
+        societies (List[OwlRolePlaying]): The societies to run.
+        round_limit (int, optional): The maximum number of rounds for each
+            society. (default: :obj:`15`)
+        concurrency (int, optional): The maximum number of societies running
+            at the same time. (default: :obj:`4`)
+
+    Returns:
+        List[Tuple[str, List[dict], dict]]: The answer, chat history and
+            token info of each society, in the order they were given.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(society: OwlRolePlaying) -> Tuple[str, List[dict], dict]:
+        async with semaphore:
+            return await arun_society(society, round_limit=round_limit)
+
+    return await asyncio.gather(*(_run(society) for society in societies))
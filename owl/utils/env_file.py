@@ -0,0 +1,194 @@
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
+import codecs
+import contextlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import Dict, Iterable
+
+# Matches an assignment of a .env file, capturing the name and the
+# double-quoted (possibly multi-line), single-quoted or bare value. A quote
+# that is never closed does not match, like python-dotenv skips it.
+_ENV_ASSIGN_RE = re.compile(
+    rb"^[ \t]*(?:export[ \t]+)?([A-Za-z_][A-Za-z0-9_.-]*)[ \t]*=[ \t]*"
+    rb"(?:\"((?:[^\"\\]|\\[\s\S])*)\"|'((?:[^'\\]|\\[\s\S])*)'|(?![\"'])([^\r\n]*))",
+    re.MULTILINE,
+)
+
+# A comment after a bare value only starts at a `#` preceded by whitespace,
+# so values such as `p#ss` or `http://host/#fragment` are kept intact
+_INLINE_COMMENT_RE = re.compile(r"\s+#.*")
+
+# Escape sequences decoded inside double- and single-quoted values, the same
+# ones python-dotenv understands
+_DOUBLE_QUOTE_ESCAPES_RE = re.compile(r"\\[\\'\"abfnrtv]")
+_SINGLE_QUOTE_ESCAPES_RE = re.compile(r"\\[\\']")
+
+# Serializes read-modify-replace cycles of .env files within this process
+_ENV_FILE_LOCK = threading.Lock()
+
+
+def _decode_escapes(regex: re.Pattern, value: str) -> str:
+    return regex.sub(
+        lambda match: codecs.decode(match.group(0), "unicode-escape"), value
+    )
+
+
+def _match_value(match: re.Match) -> str:
+    double_quoted, single_quoted, bare = match.group(2, 3, 4)
+    if double_quoted is not None:
+        return _decode_escapes(
+            _DOUBLE_QUOTE_ESCAPES_RE,
+            double_quoted.decode("utf-8", errors="replace"),
+        )
+    if single_quoted is not None:
+        return _decode_escapes(
+            _SINGLE_QUOTE_ESCAPES_RE,
+            single_quoted.decode("utf-8", errors="replace"),
+        )
+    return _INLINE_COMMENT_RE.sub("", bare.decode("utf-8", errors="replace")).rstrip()
+
+
+def parse_env(data: bytes) -> Dict[str, str]:
+    r"""Parse the content of a .env file in a single regex sweep.
+
+    Values are read the way python-dotenv reads them: quoted values keep
+    everything between the quotes, and bare values are cut at an inline
+    comment and stripped of trailing whitespace.
+
+    Args:
+        data (bytes): Raw content of the .env file.
+
+    Returns:
+        Dict[str, str]: The variables defined in the file, later definitions
+            override earlier ones.
+    """
+    return {
+        match.group(1).decode(): _match_value(match)
+        for match in _ENV_ASSIGN_RE.finditer(data)
+    }
+
+
+def read_env_file(dotenv_path: str) -> Dict[str, str]:
+    r"""Read and parse a .env file without touching the process environment.
+
+    Args:
+        dotenv_path (str): Path of the .env file.
+
+    Returns:
+        Dict[str, str]: The variables defined in the file.
+    """
+    with open(dotenv_path, "rb") as f:
+        return parse_env(f.read())
+
+
+def format_env_line(key: str, value: str) -> str:
+    r"""Format a .env line the way python-dotenv's `set_key` writes it.
+
+    Args:
+        key (str): Name of the variable.
+        value (str): Value of the variable.
+
+    Returns:
+        str: The single-quoted assignment line, ending with a newline.
+    """
+    value = value.replace("'", "\\'")
+    return f"{key}='{value}'\n"
+
+
+def _apply_env_changes(
+    data: bytes, updates: Dict[str, str], deletions: Iterable[str]
+) -> bytes:
+    chunks = []
+    written = set()
+    pos = 0
+    for match in _ENV_ASSIGN_RE.finditer(data):
+        key = match.group(1).decode()
+        if key not in updates and key not in deletions:
+            continue
+        # Keep an assignment that already holds the new value as it is written
+        if key not in deletions and _match_value(match) == updates[key]:
+            written.add(key)
+            continue
+        # Replace the whole assignment, including a trailing comment
+        end = data.find(b"\n", match.end())
+        end = len(data) if end == -1 else end + 1
+        chunks.append(data[pos : match.start()])
+        if key not in deletions:
+            chunks.append(format_env_line(key, updates[key]).encode("utf-8"))
+            written.add(key)
+        pos = end
+    chunks.append(data[pos:])
+
+    new_data = b"".join(chunks)
+    missing = [key for key in updates if key not in written]
+    if missing:
+        if new_data and not new_data.endswith(b"\n"):
+            new_data += b"\n"
+        new_data += b"".join(
+            format_env_line(key, updates[key]).encode("utf-8") for key in missing
+        )
+    return new_data
+
+
+def rewrite_env_file(
+    dotenv_path: str,
+    updates: Dict[str, str],
+    deletions: Iterable[str] = (),
+) -> bool:
+    r"""Apply several updates and deletions to a .env file with one atomic
+    write.
+
+    Comments, unrelated lines and assignments that already hold their new
+    value are kept as they are. The new content is
+    written to a unique temporary file next to the .env file, which gets
+    the permissions of the original and then replaces it. Concurrent
+    rewrites in this process are serialized so none of them is lost.
+
+    Args:
+        dotenv_path (str): Path of the .env file.
+        updates (Dict[str, str]): Variable names mapped to their new values.
+        deletions (Iterable[str]): Names of variables to remove, they take
+            precedence over `updates`. (default: :obj:`()`)
+
+    Returns:
+        bool: Whether the file content changed and was written.
+    """
+    deletions = set(deletions)
+    with _ENV_FILE_LOCK:
+        with open(dotenv_path, "rb") as f:
+            data = f.read()
+        new_data = _apply_env_changes(data, updates, deletions)
+        # Leave the file, and its modification time, alone if nothing changed
+        if new_data == data:
+            return False
+
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(dotenv_path)),
+            prefix=".env.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(new_data)
+            shutil.copymode(dotenv_path, tmp_path)
+            os.replace(tmp_path, dotenv_path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+    return True
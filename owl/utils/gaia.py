@@ -22,6 +22,7 @@ import string
 from pathlib import Path
 from typing import Any, Dict, List, Literal, Optional, Union, Tuple
 
+import orjson
 from tqdm import tqdm
 from camel.benchmarks import BaseBenchmark
 from camel.tasks import Task
@@ -91,9 +92,14 @@ class GAIABenchmark(BaseBenchmark):
             }
 
             constructed_data.append(tmp_dict)
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(constructed_data, f, indent=4)
-        f.close()
+        with open(save_path, "wb") as f:
+            f.write(
+                orjson.dumps(
+                    constructed_data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE,
+                    default=str,
+                )
+            )
 
         print(f"Successfully dumped tasks to {save_path}")
 
@@ -185,9 +191,8 @@ class GAIABenchmark(BaseBenchmark):
 
         if save_result:
             try:
-                with open(self.save_to, "r", encoding="utf-8") as f:
-                    self._results = json.load(f)
-                f.close()
+                with open(self.save_to, "rb") as f:
+                    self._results = orjson.loads(f.read())
             except Exception as e:
                 logger.warning(e)
                 # raise FileNotFoundError(f"{self.save_to} does not exist.")
@@ -257,9 +262,14 @@ class GAIABenchmark(BaseBenchmark):
                 logger.error(f"Error in processing task: {e}")
 
             if save_result:
-                with open(self.save_to, "w") as f:
-                    json.dump(self._results, f, indent=4, ensure_ascii=False)
-                f.close()
+                with open(self.save_to, "wb") as f:
+                    f.write(
+                        orjson.dumps(
+                            self._results,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE,
+                            default=str,
+                        )
+                    )
 
         return self._generate_summary()
 
@@ -13,25 +13,35 @@
 # ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
 # Import from the correct module path
 from utils import run_society
+from utils.env_file import read_env_file, rewrite_env_file
 import os
+import sys
 import gradio as gr
 import time
-import json
+import orjson
 import logging
 import datetime
-from typing import Tuple
+import functools
+import hashlib
+from typing import Callable, Optional, Tuple
 import importlib
-from dotenv import load_dotenv, set_key, find_dotenv, unset_key
+from dotenv import load_dotenv, find_dotenv
 import threading
 import queue
 import re
+from collections import deque
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
 
 os.environ["PYTHONIOENCODING"] = "utf-8"
 
 
 # Configure logging system
 def setup_logging():
-    """Configure logging system to output logs to file, memory queue, and console"""
+    """Configure logging system to output logs to file, memory buffer, and console"""
     # Create logs directory (if it doesn't exist)
     logs_dir = os.path.join(os.path.dirname(__file__), "logs")
     os.makedirs(logs_dir, exist_ok=True)
@@ -64,9 +74,18 @@ def setup_logging():
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
+    # Seed the memory buffer with the existing tail of today's log file, then
+    # keep it fed straight from the logging system
+    if os.path.exists(log_file):
+        LOG_BUFFER.extend(read_log_tail(log_file, LOG_BUFFER.maxlen))
+    buffer_handler = LogBufferHandler(LOG_BUFFER)
+    buffer_handler.setLevel(logging.INFO)
+    buffer_handler.setFormatter(formatter)
+
     # Add handlers to root logger
     root_logger.addHandler(file_handler)
     root_logger.addHandler(console_handler)
+    root_logger.addHandler(buffer_handler)
 
     logging.info("Logging system initialized, log file: %s", log_file)
     return log_file
@@ -74,90 +93,135 @@ def setup_logging():
 
 # Global variables
 LOG_FILE = None
-LOG_QUEUE: queue.Queue = queue.Queue()  # Log queue
-STOP_LOG_THREAD = threading.Event()
+LOG_BUFFER: deque = deque(maxlen=500)  # Ring buffer of the newest log lines
+LOG_SEQUENCE = 0  # Number of records added to the log buffer, used to detect changes
+LOG_CONDITION = threading.Condition()  # Notified whenever a record is added
+LOG_FLUSH_INTERVAL = 0.2  # Minimum seconds between two streamed log updates
+
+# Patterns used to pull conversation messages out of model log lines
+_LOG_FILTER_MARKER = "camel.agents.chat_agent - INFO"
+_MESSAGES_MARKER = "processed these messages: ["
+_USER_RE = re.compile(r"\{'role': 'user', 'content': '(.*?)'\}")
+_ASSISTANT_RE = re.compile(r"\{'role': 'assistant', 'content': '(.*?)'\}")
 CURRENT_PROCESS = None  # Used to track the currently running process
 STOP_REQUESTED = threading.Event()  # Used to mark if stop was requested
+_APP_SINGLETON = None  # Gradio app built by create_ui
+FAVICON_PATH = os.path.join(os.path.dirname(__file__), "assets", "owl-favicon.ico")
 
 
 # Log reading and updating functions
-def log_reader_thread(log_file):
-    """Background thread that continuously reads the log file and adds new lines to the queue"""
-    try:
-        with open(log_file, "r", encoding="utf-8") as f:
-            # Move to the end of file
-            f.seek(0, 2)
-
-            while not STOP_LOG_THREAD.is_set():
-                line = f.readline()
-                if line:
-                    LOG_QUEUE.put(line)  # Add to conversation record queue
-                else:
-                    # No new lines, wait for a short time
-                    time.sleep(0.1)
-    except Exception as e:
-        logging.error(f"Log reader thread error: {str(e)}")
+def read_log_tail(log_file, max_lines, avg_line_size=256):
+    """Read the last lines of the log file without loading the whole file
+
+    Args:
+        log_file: Path of the log file
+        max_lines: Maximum number of lines to return
+        avg_line_size: Estimated bytes per line, used to size the first tail read
+
+    Returns:
+        list: The last lines of the file
+    """
+    with open(log_file, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        block = max_lines * avg_line_size
+        while True:
+            start = max(0, end - block)
+            f.seek(start)
+            chunk = f.read(end - start)
+            # Widen the window until it holds enough lines or the whole file
+            if start == 0 or chunk.count(b"\n") > max_lines:
+                break
+            block *= 2
+
+    lines = chunk.decode("utf-8", errors="replace").splitlines(keepends=True)
+    # The first line is probably cut in half unless we started at the beginning
+    if start > 0 and lines:
+        lines = lines[1:]
+    return lines[-max_lines:]
+
+
+class LogBufferHandler(logging.Handler):
+    """Logging handler that appends formatted records to the in-memory log buffer"""
+
+    def __init__(self, buffer):
+        super().__init__()
+        self.buffer = buffer
+
+    def emit(self, record):
+        global LOG_SEQUENCE
+        try:
+            self.buffer.append(self.format(record) + "\n")
+            with LOG_CONDITION:
+                LOG_SEQUENCE += 1
+                LOG_CONDITION.notify_all()
+        except Exception:
+            self.handleError(record)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_log_messages(log: str) -> Tuple[Tuple[str, str], ...]:
+    """Extract (role, content) pairs of user and assistant messages from a log line
+
+    Results are cached per line, so repeated polls over the same buffer do not
+    parse the same payload twice.
+    """
+    # Try to extract message array
+    start = log.find(_MESSAGES_MARKER)
+    end = log.rfind("]")
+
+    if start != -1 and end > start:
+        try:
+            messages = orjson.loads(log[start + len(_MESSAGES_MARKER) - 1 : end + 1])
+            parsed = tuple(
+                (msg.get("role"), msg.get("content", ""))
+                for msg in messages
+                if msg.get("role") in ["user", "assistant"]
+            )
+            if parsed:
+                return parsed
+        except orjson.JSONDecodeError:
+            pass
+
+    # If JSON parsing fails or no message array is found, try to extract conversation content directly
+    return tuple(("user", content) for content in _USER_RE.findall(log)) + tuple(
+        ("assistant", content) for content in _ASSISTANT_RE.findall(log)
+    )
+
+
+@functools.lru_cache(maxsize=2048)
+def _format_message(role: str, content: str) -> str:
+    """Render a single message as a Markdown block, cached across polls"""
+    content = content.replace("\\n", "\n")
+    lines = [line.strip() for line in content.split("\n")]
+    content = "\n".join(lines)
+
+    role_emoji = "🙋" if role.lower() == "user" else "🤖"
+    return f"""### {role_emoji} {role.title()} Agent
+
+{content}"""
 
 
 def get_latest_logs(max_lines=100, queue_source=None):
-    """Get the latest log lines from the queue, or read directly from the file if the queue is empty
+    """Get the latest log lines from the in-memory log buffer
 
     Args:
         max_lines: Maximum number of lines to return
-        queue_source: Specify which queue to use, default is LOG_QUEUE
+        queue_source: Specify which buffer to use, default is LOG_BUFFER
 
     Returns:
         str: Log content
     """
-    logs = []
-    log_queue = queue_source if queue_source else LOG_QUEUE
-
-    # Create a temporary queue to store logs so we can process them without removing them from the original queue
-    temp_queue = queue.Queue()
-    temp_logs = []
+    log_buffer = queue_source if queue_source is not None else LOG_BUFFER
 
-    try:
-        # Try to get all available log lines from the queue
-        while not log_queue.empty() and len(temp_logs) < max_lines:
-            log = log_queue.get_nowait()
-            temp_logs.append(log)
-            temp_queue.put(log)  # Put the log back into the temporary queue
-    except queue.Empty:
-        pass
-
-    # Process conversation records
-    logs = temp_logs
-
-    # If there are no new logs or not enough logs, try to read the last few lines directly from the file
-    if len(logs) < max_lines and LOG_FILE and os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                all_lines = f.readlines()
-                # If there are already some logs in the queue, only read the remaining needed lines
-                remaining_lines = max_lines - len(logs)
-                file_logs = (
-                    all_lines[-remaining_lines:]
-                    if len(all_lines) > remaining_lines
-                    else all_lines
-                )
-
-                # Add file logs before queue logs
-                logs = file_logs + logs
-        except Exception as e:
-            error_msg = f"Error reading log file: {str(e)}"
-            logging.error(error_msg)
-            if not logs:  # Only add error message if there are no logs
-                logs = [error_msg]
+    # Take a snapshot of the newest lines, the buffer itself is left untouched
+    logs = list(log_buffer)[-max_lines:]
 
-    # If there are still no logs, return a prompt message
+    # If there are no logs yet, return a prompt message
     if not logs:
         return "Initialization in progress..."
 
     # Filter logs, only keep logs with 'camel.agents.chat_agent - INFO'
-    filtered_logs = []
-    for log in logs:
-        if "camel.agents.chat_agent - INFO" in log:
-            filtered_logs.append(log)
+    filtered_logs = [log for log in logs if _LOG_FILTER_MARKER in log]
 
     # If there are no logs after filtering, return a prompt message
     if not filtered_logs:
@@ -166,61 +230,26 @@ def get_latest_logs(max_lines=100, queue_source=None):
     # Process log content, extract the latest user and assistant messages
     simplified_logs = []
 
-    # Use a set to track messages that have already been processed, to avoid duplicates
+    # Use a set of short digests to track messages that have already been processed, to avoid duplicates
     processed_messages = set()
 
     def process_message(role, content):
-        # Create a unique identifier to track messages
-        msg_id = f"{role}:{content}"
+        # Create a compact identifier to track messages
+        msg_id = hashlib.blake2b(
+            f"{role}:{content}".encode("utf-8", "surrogatepass"), digest_size=8
+        ).digest()
         if msg_id in processed_messages:
             return None
 
         processed_messages.add(msg_id)
-        content = content.replace("\\n", "\n")
-        lines = [line.strip() for line in content.split("\n")]
-        content = "\n".join(lines)
-
-        role_emoji = "🙋" if role.lower() == "user" else "🤖"
-        return f"""### {role_emoji} {role.title()} Agent
-
-{content}"""
+        return _format_message(role, content)
 
     for log in filtered_logs:
         formatted_messages = []
-        # Try to extract message array
-        messages_match = re.search(
-            r"Model (.*?), index (\d+), processed these messages: (\[.*\])", log
-        )
-
-        if messages_match:
-            try:
-                messages = json.loads(messages_match.group(3))
-                for msg in messages:
-                    if msg.get("role") in ["user", "assistant"]:
-                        formatted_msg = process_message(
-                            msg.get("role"), msg.get("content", "")
-                        )
-                        if formatted_msg:
-                            formatted_messages.append(formatted_msg)
-            except json.JSONDecodeError:
-                pass
-
-        # If JSON parsing fails or no message array is found, try to extract conversation content directly
-        if not formatted_messages:
-            user_pattern = re.compile(r"\{'role': 'user', 'content': '(.*?)'\}")
-            assistant_pattern = re.compile(
-                r"\{'role': 'assistant', 'content': '(.*?)'\}"
-            )
-
-            for content in user_pattern.findall(log):
-                formatted_msg = process_message("user", content)
-                if formatted_msg:
-                    formatted_messages.append(formatted_msg)
-
-            for content in assistant_pattern.findall(log):
-                formatted_msg = process_message("assistant", content)
-                if formatted_msg:
-                    formatted_messages.append(formatted_msg)
+        for role, content in _parse_log_messages(log):
+            formatted_msg = process_message(role, content)
+            if formatted_msg:
+                formatted_messages.append(formatted_msg)
 
         if formatted_messages:
             simplified_logs.append("\n\n".join(formatted_messages))
@@ -259,6 +288,9 @@ MODULE_DESCRIPTIONS = {
     "run_novita_ai": "Using novita ai model to process tasks",
 }
 
+# Names of the modules that can be selected and run
+_MODULE_NAMES = frozenset(MODULE_DESCRIPTIONS)
+
 
 # Default environment variable template
 DEFAULT_ENV_TEMPLATE = """#===========================================
@@ -315,6 +347,18 @@ def validate_input(question: str) -> bool:
     return True
 
 
+def _cached_import(module_path: str):
+    """Return an already imported module without going through the import system"""
+    module = sys.modules.get(module_path)
+    if module is None:
+        module = importlib.import_module(module_path)
+    return module
+
+
+# construct_society functions of the example modules loaded so far, by module name
+_SOCIETY_BUILDERS: dict[str, Callable] = {}
+
+
 def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
     """Run the OWL system and return results
 
@@ -338,13 +382,13 @@ def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
 
     try:
         # Ensure environment variables are loaded
-        load_dotenv(find_dotenv(), override=True)
+        _ensure_env_loaded()
         logging.info(
             f"Processing question: '{question}', using module: {example_module}"
         )
 
         # Check if the module is in MODULE_DESCRIPTIONS
-        if example_module not in MODULE_DESCRIPTIONS:
+        if example_module not in _MODULE_NAMES:
             logging.error(f"User selected an unsupported module: {example_module}")
             return (
                 f"Selected module '{example_module}' is not supported",
@@ -352,43 +396,48 @@ def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
                 "❌ Error: Unsupported module",
             )
 
-        # Dynamically import target module
-        module_path = f"examples.{example_module}"
-        try:
-            logging.info(f"Importing module: {module_path}")
-            module = importlib.import_module(module_path)
-        except ImportError as ie:
-            logging.error(f"Unable to import module {module_path}: {str(ie)}")
-            return (
-                f"Unable to import module: {module_path}",
-                "0",
-                f"❌ Error: Module {example_module} does not exist or cannot be loaded - {str(ie)}",
-            )
-        except Exception as e:
-            logging.error(
-                f"Error occurred while importing module {module_path}: {str(e)}"
-            )
-            return (
-                f"Error occurred while importing module: {module_path}",
-                "0",
-                f"❌ Error: {str(e)}",
-            )
+        # Reuse the construct_society function of a module that was already loaded
+        construct_society = _SOCIETY_BUILDERS.get(example_module)
+        if construct_society is None:
+            # Dynamically import target module
+            module_path = f"examples.{example_module}"
+            try:
+                logging.info(f"Importing module: {module_path}")
+                module = _cached_import(module_path)
+            except ImportError as ie:
+                logging.error(f"Unable to import module {module_path}: {str(ie)}")
+                return (
+                    f"Unable to import module: {module_path}",
+                    "0",
+                    f"❌ Error: Module {example_module} does not exist or cannot be loaded - {str(ie)}",
+                )
+            except Exception as e:
+                logging.error(
+                    f"Error occurred while importing module {module_path}: {str(e)}"
+                )
+                return (
+                    f"Error occurred while importing module: {module_path}",
+                    "0",
+                    f"❌ Error: {str(e)}",
+                )
 
-        # Check if it contains the construct_society function
-        if not hasattr(module, "construct_society"):
-            logging.error(
-                f"construct_society function not found in module {module_path}"
-            )
-            return (
-                f"construct_society function not found in module {module_path}",
-                "0",
-                "❌ Error: Module interface incompatible",
-            )
+            # Check if it contains the construct_society function
+            construct_society = getattr(module, "construct_society", None)
+            if construct_society is None:
+                logging.error(
+                    f"construct_society function not found in module {module_path}"
+                )
+                return (
+                    f"construct_society function not found in module {module_path}",
+                    "0",
+                    "❌ Error: Module interface incompatible",
+                )
+            _SOCIETY_BUILDERS[example_module] = construct_society
 
         # Build society simulation
         try:
             logging.info("Building society simulation...")
-            society = module.construct_society(question)
+            society = construct_society(question)
 
         except Exception as e:
             logging.error(f"Error occurred while building society simulation: {str(e)}")
@@ -444,17 +493,54 @@ def update_module_description(module_name: str) -> str:
 # Store environment variables configured from the frontend
 WEB_FRONTEND_ENV_VARS: dict[str, str] = {}
 
+# Resolved path of the .env file, set by init_env_file
+_DOTENV_PATH: Optional[str] = None
+# Modification time of the .env file when run_owl last loaded it
+_DOTENV_MTIME: Optional[int] = None
+
+# Parsed .env file contents, keyed by path and modification time
+_ENV_CACHE = {"mtime": None, "path": None, "vars": None}
+
+# Rows of the environment variable table, keyed by the .env modification time
+_ENV_TABLE_CACHE = {"mtime": None, "rows": None}
+
+
+def invalidate_env_cache():
+    """Force the next load_env_vars and update_env_table calls to re-read the .env file"""
+    _ENV_CACHE["mtime"] = None
+    _ENV_TABLE_CACHE["mtime"] = None
+
 
 def init_env_file():
     """Initialize .env file if it doesn't exist"""
+    global _DOTENV_PATH
+    # Reuse the resolved path while the file is still there
+    if _DOTENV_PATH and os.path.isfile(_DOTENV_PATH):
+        return _DOTENV_PATH
+
     dotenv_path = find_dotenv()
     if not dotenv_path:
         with open(".env", "w") as f:
             f.write(DEFAULT_ENV_TEMPLATE)
-        dotenv_path = find_dotenv()
+        # The file was just created here, no need to search for it again
+        dotenv_path = os.path.abspath(".env")
+    _DOTENV_PATH = dotenv_path
     return dotenv_path
 
 
+def _ensure_env_loaded():
+    """Load the .env file into the process environment if it changed since the last load"""
+    global _DOTENV_MTIME
+    dotenv_path = init_env_file()
+    try:
+        mtime = os.stat(dotenv_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime != _DOTENV_MTIME:
+        load_dotenv(dotenv_path, override=True)
+        _DOTENV_MTIME = mtime
+
+
 def load_env_vars():
     """Load environment variables and return as dictionary format
 
@@ -462,30 +548,24 @@ def load_env_vars():
         dict: Environment variable dictionary, each value is a tuple containing value and source (value, source)
     """
     dotenv_path = init_env_file()
-    load_dotenv(dotenv_path, override=True)
-
-    # Read environment variables from .env file
-    env_file_vars = {}
-    with open(dotenv_path, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#"):
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    env_file_vars[key.strip()] = value.strip().strip("\"'")
-
-    # Get from system environment variables
-    system_env_vars = {
-        k: v
-        for k, v in os.environ.items()
-        if k not in env_file_vars and k not in WEB_FRONTEND_ENV_VARS
-    }
-
-    # Merge environment variables and mark sources
+
+    # Reuse the parsed .env file while it is unchanged on disk
+    mtime = os.stat(dotenv_path).st_mtime_ns
+    if _ENV_CACHE["path"] == dotenv_path and _ENV_CACHE["mtime"] == mtime:
+        env_file_vars = _ENV_CACHE["vars"]
+    else:
+        load_dotenv(dotenv_path, override=True)
+
+        # Read environment variables from .env file
+        env_file_vars = read_env_file(dotenv_path)
+
+        _ENV_CACHE.update(path=dotenv_path, mtime=mtime, vars=env_file_vars)
+
+    # Merge environment variables and mark sources, later sources override earlier ones
     env_vars = {}
 
     # Add system environment variables (lowest priority)
-    for key, value in system_env_vars.items():
+    for key, value in os.environ.items():
         env_vars[key] = (value, "System")
 
     # Add .env file environment variables (medium priority)
@@ -510,19 +590,18 @@ def save_env_vars(env_vars):
     try:
         dotenv_path = init_env_file()
 
-        # Save each environment variable
-        for key, value_data in env_vars.items():
-            if key and key.strip():  # Ensure key is not empty
-                # Handle case where value might be a tuple
-                if isinstance(value_data, tuple):
-                    value = value_data[0]
-                else:
-                    value = value_data
-
-                set_key(dotenv_path, key.strip(), value.strip())
+        # Normalize to (key, value) pairs, values might be (value, source) tuples
+        items = [
+            (key.strip(), (value[0] if isinstance(value, tuple) else value).strip())
+            for key, value in env_vars.items()
+            if key and key.strip()  # Ensure key is not empty
+        ]
 
-        # Reload environment variables to ensure they take effect
-        load_dotenv(dotenv_path, override=True)
+        # Save all environment variables with a single write, and only
+        # reload them if the file actually changed
+        if rewrite_env_file(dotenv_path, dict(items)):
+            load_dotenv(dotenv_path, override=True)
+            invalidate_env_cache()
 
         return True, "Environment variables have been successfully saved!"
     except Exception as e:
@@ -547,13 +626,14 @@ def add_env_var(key, value, from_frontend=True):
         # If from frontend, add to frontend environment variable dictionary
         if from_frontend:
             WEB_FRONTEND_ENV_VARS[key] = value
-            # Directly update system environment variables
-            os.environ[key] = value
+
+        # Directly update system environment variables
+        os.environ[key] = value
 
         # Also update .env file
         dotenv_path = init_env_file()
-        set_key(dotenv_path, key, value)
-        load_dotenv(dotenv_path, override=True)
+        rewrite_env_file(dotenv_path, {key: value})
+        invalidate_env_cache()
 
         return True, f"Environment variable {key} has been successfully added/updated!"
     except Exception as e:
@@ -570,7 +650,7 @@ def delete_env_var(key):
 
         # Delete from .env file
         dotenv_path = init_env_file()
-        unset_key(dotenv_path, key)
+        rewrite_env_file(dotenv_path, {}, {key})
 
         # Delete from frontend environment variable dictionary
         if key in WEB_FRONTEND_ENV_VARS:
@@ -580,11 +660,51 @@ def delete_env_var(key):
         if key in os.environ:
             del os.environ[key]
 
+        invalidate_env_cache()
         return True, f"Environment variable {key} has been successfully deleted!"
     except Exception as e:
         return False, f"Error deleting environment variable: {str(e)}"
 
 
+def _bulk_set_env(updates, deletions):
+    """Add, update and delete several environment variables with one .env write
+
+    Args:
+        updates: Dictionary of variable names to new values
+        deletions: Set of variable names to remove
+    """
+    rewrite_env_file(init_env_file(), updates, deletions)
+
+    # Keep the frontend configuration and process environment in sync
+    for key in deletions:
+        WEB_FRONTEND_ENV_VARS.pop(key, None)
+        os.environ.pop(key, None)
+    WEB_FRONTEND_ENV_VARS.update(updates)
+    os.environ.update(updates)
+
+    invalidate_env_cache()
+
+
+# API-related keywords
+API_KEYWORDS = [
+    "api",
+    "key",
+    "token",
+    "secret",
+    "password",
+    "openai",
+    "qwen",
+    "deepseek",
+    "google",
+    "search",
+    "hf",
+    "hugging",
+    "chunkr",
+    "firecrawl",
+]
+_API_KEYWORD_RE = re.compile("|".join(map(re.escape, API_KEYWORDS)))
+
+
 def is_api_related(key: str) -> bool:
     """Determine if an environment variable is API-related
 
@@ -594,26 +714,61 @@ def is_api_related(key: str) -> bool:
     Returns:
         bool: Whether it's API-related
     """
-    # API-related keywords
-    api_keywords = [
-        "api",
-        "key",
-        "token",
-        "secret",
-        "password",
-        "openai",
-        "qwen",
-        "deepseek",
-        "google",
-        "search",
-        "hf",
-        "hugging",
-        "chunkr",
-        "firecrawl",
-    ]
-
     # Check if it contains API-related keywords (case insensitive)
-    return any(keyword in key.lower() for keyword in api_keywords)
+    return _API_KEYWORD_RE.search(key.lower()) is not None
+
+
+# Guide links for API keys, the first entry whose keyword appears in the
+# lowercased variable name wins
+API_GUIDES = (
+    (("openai",), "https://platform.openai.com/api-keys"),
+    (
+        ("qwen", "dashscope"),
+        "https://help.aliyun.com/zh/model-studio/developer-reference/get-api-key",
+    ),
+    (("deepseek",), "https://platform.deepseek.com/api_keys"),
+    (
+        ("ppio",),
+        "https://ppinfra.com/settings/key-management?utm_source=github_owl",
+    ),
+    (
+        ("google", "search_engine_id"),
+        "https://coda.io/@jon-dallas/google-image-search-pack-example/search-engine-id-and-google-api-key-3",
+    ),
+    (("chunkr",), "https://chunkr.ai/"),
+    (("firecrawl",), "https://www.firecrawl.dev/"),
+    (
+        ("novita",),
+        "https://novita.ai/settings/key-management?utm_source=github_owl&utm_medium=github_readme&utm_campaign=github_link",
+    ),
+)
+
+
+# Clickable guide link shown in the environment variable table
+GUIDE_LINK_TEMPLATE = "<a href='%s' target='_blank' class='guide-link'>🔗 Get</a>"
+
+
+def _api_guide_for(key_lower: str) -> str:
+    """Look up the API guide link for an already lowercased variable name"""
+    for keywords, url in API_GUIDES:
+        if any(keyword in key_lower for keyword in keywords):
+            return url
+    return ""
+
+
+# Guide link HTML rendered once per guide entry
+_GUIDE_LINKS = tuple(
+    (keywords, GUIDE_LINK_TEMPLATE % url) for keywords, url in API_GUIDES
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _guide_link_for(key_lower: str) -> str:
+    """Return the prebuilt guide link HTML for an already lowercased variable name"""
+    for keywords, link in _GUIDE_LINKS:
+        if any(keyword in key_lower for keyword in keywords):
+            return link
+    return ""
 
 
 def get_api_guide(key: str) -> str:
@@ -625,47 +780,29 @@ def get_api_guide(key: str) -> str:
     Returns:
         str: API guide link or description
     """
-    key_lower = key.lower()
-    if "openai" in key_lower:
-        return "https://platform.openai.com/api-keys"
-    elif "qwen" in key_lower or "dashscope" in key_lower:
-        return "https://help.aliyun.com/zh/model-studio/developer-reference/get-api-key"
-    elif "deepseek" in key_lower:
-        return "https://platform.deepseek.com/api_keys"
-    elif "ppio" in key_lower:
-        return "https://ppinfra.com/settings/key-management?utm_source=github_owl"
-    elif "google" in key_lower:
-        return "https://coda.io/@jon-dallas/google-image-search-pack-example/search-engine-id-and-google-api-key-3"
-    elif "search_engine_id" in key_lower:
-        return "https://coda.io/@jon-dallas/google-image-search-pack-example/search-engine-id-and-google-api-key-3"
-    elif "chunkr" in key_lower:
-        return "https://chunkr.ai/"
-    elif "firecrawl" in key_lower:
-        return "https://www.firecrawl.dev/"
-    elif "novita" in key_lower:
-        return "https://novita.ai/settings/key-management?utm_source=github_owl&utm_medium=github_readme&utm_campaign=github_link"
-    else:
-        return ""
+    return _api_guide_for(key.lower())
 
 
 def update_env_table():
     """Update environment variable table display, only showing API-related environment variables"""
+    # Reuse the rows built for the unchanged .env file
+    mtime = os.stat(init_env_file()).st_mtime_ns
+    if _ENV_TABLE_CACHE["mtime"] == mtime:
+        return [list(row) for row in _ENV_TABLE_CACHE["rows"]]
+
     env_vars = load_env_vars()
-    # Filter out API-related environment variables
-    api_env_vars = {k: v for k, v in env_vars.items() if is_api_related(k)}
-    # Convert to list format to meet Gradio Dataframe requirements
+    # Convert API-related environment variables to list format to meet Gradio Dataframe requirements
     # Format: [Variable name, Variable value, Guide link]
     result = []
-    for k, v in api_env_vars.items():
-        guide = get_api_guide(k)
-        # If there's a guide link, create a clickable link
-        guide_link = (
-            f"<a href='{guide}' target='_blank' class='guide-link'>🔗 Get</a>"
-            if guide
-            else ""
-        )
-        result.append([k, v[0], guide_link])
-    return result
+    for k, (value, _source) in env_vars.items():
+        key_lower = k.lower()
+        if _API_KEYWORD_RE.search(key_lower) is None:
+            continue
+        # Clickable guide link, if there is one for this variable
+        result.append([k, value, _guide_link_for(key_lower)])
+
+    _ENV_TABLE_CACHE.update(mtime=mtime, rows=result)
+    return [list(row) for row in result]
 
 
 def save_env_table_changes(data):
@@ -685,31 +822,25 @@ def save_env_table_changes(data):
         # Get all current environment variables
         current_env_vars = load_env_vars()
         processed_keys = set()  # Record processed keys to detect deleted variables
+        updates = {}  # Collected changes, written to the .env file in one go
 
         # Process pandas DataFrame object
-        import pandas as pd
-
-        if isinstance(data, pd.DataFrame):
+        if pd is not None and isinstance(data, pd.DataFrame):
             # Get column name information
             columns = data.columns.tolist()
             logging.info(f"DataFrame column names: {columns}")
 
-            # Iterate through each row of the DataFrame
-            for index, row in data.iterrows():
-                # Use column names to access data
-                if len(columns) >= 3:
-                    # Get variable name and value (column 0 is name, column 1 is value)
-                    key = row[0] if isinstance(row, pd.Series) else row.iloc[0]
-                    value = row[1] if isinstance(row, pd.Series) else row.iloc[1]
-
+            # Iterate through each row of the DataFrame (column 0 is name, column 1 is value)
+            if len(columns) >= 2:
+                for key, value, *_ in data.itertuples(index=False, name=None):
                     # Check if it's an empty row or deleted variable
-                    if (
-                        key and str(key).strip()
+                    if key and (
+                        key := str(key).strip()
                     ):  # If key name is not empty, add or update
                         logging.info(
                             f"Processing environment variable: {key} = {value}"
                         )
-                        add_env_var(key, str(value))
+                        updates[key] = str(value).strip()
                         processed_keys.add(key)
         # Process other formats
         elif isinstance(data, dict):
@@ -730,19 +861,23 @@ def save_env_table_changes(data):
 
             if isinstance(rows, list):
                 for row in rows:
-                    if isinstance(row, list) and len(row) >= 2:
-                        key, value = row[0], row[1]
-                        if key and str(key).strip():
-                            add_env_var(key, str(value))
-                            processed_keys.add(key)
+                    # Only list-like rows, a str row such as "AB" is not a name/value pair
+                    if not isinstance(row, (list, tuple)) or len(row) < 2:
+                        continue
+                    key, value = row[0], row[1]
+                    if key and (key := str(key).strip()):
+                        updates[key] = str(value).strip()
+                        processed_keys.add(key)
         elif isinstance(data, list):
             # 列表格式
             for row in data:
-                if isinstance(row, list) and len(row) >= 2:
-                    key, value = row[0], row[1]
-                    if key and str(key).strip():
-                        add_env_var(key, str(value))
-                        processed_keys.add(key)
+                # Only list-like rows, a str row such as "AB" is not a name/value pair
+                if not isinstance(row, (list, tuple)) or len(row) < 2:
+                    continue
+                key, value = row[0], row[1]
+                if key and (key := str(key).strip()):
+                    updates[key] = str(value).strip()
+                    processed_keys.add(key)
         else:
             logging.error(f"Unknown data format: {type(data)}")
             return f"❌ Save failed: Unknown data format {type(data)}"
@@ -754,14 +889,25 @@ def save_env_table_changes(data):
         # Delete variables no longer in the table
         for key in keys_to_delete:
             logging.info(f"Deleting environment variable: {key}")
-            delete_env_var(key)
+
+        # Only write rows that differ from what is already saved, system
+        # variables are still written so they get persisted to .env
+        changed = {
+            key: value
+            for key, value in updates.items()
+            if current_env_vars.get(key)
+            not in (
+                (value, ".env file"),
+                (value, "Frontend configuration"),
+            )
+        }
+
+        if changed or keys_to_delete:
+            _bulk_set_env(changed, keys_to_delete)
 
         return "✅ Environment variables have been successfully saved"
     except Exception as e:
-        import traceback
-
-        error_details = traceback.format_exc()
-        logging.error(f"Error saving environment variables: {str(e)}\n{error_details}")
+        logging.exception("Error saving environment variables")
         return f"❌ Save failed: {str(e)}"
 
 
@@ -779,7 +925,10 @@ def get_env_var_value(key):
 
 
 def create_ui():
-    """Create enhanced Gradio interface"""
+    """Create enhanced Gradio interface, built once per process"""
+    global _APP_SINGLETON
+    if _APP_SINGLETON is not None:
+        return _APP_SINGLETON
 
     def clear_log_file():
         """Clear log file content"""
@@ -788,12 +937,8 @@ def create_ui():
                 # Clear log file content instead of deleting the file
                 open(LOG_FILE, "w").close()
                 logging.info("Log file has been cleared")
-                # Clear log queue
-                while not LOG_QUEUE.empty():
-                    try:
-                        LOG_QUEUE.get_nowait()
-                    except queue.Empty:
-                        break
+                # Clear log buffer
+                LOG_BUFFER.clear()
                 return ""
             else:
                 return ""
@@ -811,6 +956,7 @@ def create_ui():
 
         # Create a background thread to process the question
         result_queue = queue.Queue()
+        done_event = threading.Event()  # Set as soon as the background thread finishes
 
         def process_in_background():
             try:
@@ -820,25 +966,41 @@ def create_ui():
                 result_queue.put(
                     (f"Error occurred: {str(e)}", "0", f"❌ Error: {str(e)}")
                 )
+            finally:
+                done_event.set()
+                # Wake the streaming loop below
+                with LOG_CONDITION:
+                    LOG_CONDITION.notify_all()
 
         # Start background processing thread
         bg_thread = threading.Thread(target=process_in_background)
         CURRENT_PROCESS = bg_thread  # Record current process
         bg_thread.start()
 
-        # While waiting for processing to complete, update logs once per second
-        while bg_thread.is_alive():
-            # Update conversation record display
-            logs2 = get_latest_logs(100, LOG_QUEUE)
-
-            # Always update status
-            yield (
-                "0",
-                "<span class='status-indicator status-running'></span> Processing...",
-                logs2,
-            )
+        # While waiting for processing to complete, stream new logs as they arrive
+        last_sequence = None
+        while not done_event.is_set():
+            # Only re-render when new records arrived, idle ticks send nothing
+            if LOG_SEQUENCE != last_sequence:
+                last_sequence = LOG_SEQUENCE
+                # Update conversation record display
+                logs2 = get_latest_logs(100, LOG_BUFFER)
+
+                yield (
+                    "0",
+                    "<span class='status-indicator status-running'></span> Processing...",
+                    logs2,
+                )
 
-            time.sleep(1)
+            # Sleep until new records arrive or the background thread finishes
+            with LOG_CONDITION:
+                LOG_CONDITION.wait_for(
+                    lambda: LOG_SEQUENCE != last_sequence or done_event.is_set(),
+                    timeout=1.0,
+                )
+            # Coalesce bursts of records into a single update
+            if not done_event.is_set():
+                time.sleep(LOG_FLUSH_INTERVAL)
 
         # Processing complete, get results
         if not result_queue.empty():
@@ -846,7 +1008,7 @@ def create_ui():
             answer, token_count, status = result
 
             # Final update of conversation record
-            logs2 = get_latest_logs(100, LOG_QUEUE)
+            logs2 = get_latest_logs(100, LOG_BUFFER)
 
             # Set different indicators based on status
             if "Error" in status:
@@ -860,7 +1022,7 @@ def create_ui():
 
             yield token_count, status_with_indicator, logs2
         else:
-            logs2 = get_latest_logs(100, LOG_QUEUE)
+            logs2 = get_latest_logs(100, LOG_BUFFER)
             yield (
                 "0",
                 "<span class='status-indicator status-error'></span> Terminated",
@@ -1155,9 +1317,6 @@ def create_ui():
 
                     with gr.Row():
                         refresh_logs_button2 = gr.Button("Refresh Record")
-                        auto_refresh_checkbox2 = gr.Checkbox(
-                            label="Auto Refresh", value=True, interactive=True
-                        )
                         clear_logs_button2 = gr.Button(
                             "Clear Record", variant="secondary"
                         )
@@ -1176,7 +1335,7 @@ def create_ui():
                             with gr.Column(scale=3):
                                 with gr.Group(elem_classes="env-controls"):
                                     # Environment variable table - set to interactive for direct editing
-                                    gr.Markdown("""
+                                    gr.HTML("""
                                     <div style="background-color: #e7f3fe; border-left: 6px solid #2196F3; padding: 10px; margin: 15px 0; border-radius: 4px;">
                                       <strong>Tip:</strong> Please make sure to run cp .env_template .env to create a local .env file, and flexibly configure the required environment variables according to the running module
                                     </div>
@@ -1196,14 +1355,14 @@ def create_ui():
                                         ],  # Set the last column as HTML type to support links
                                         row_count=10,  # Increase row count to allow adding new variables
                                         col_count=(3, "fixed"),
-                                        value=update_env_table,
+                                        type="array",  # Plain lists of strings, no pandas DataFrame
                                         label="API Keys and Environment Variables",
                                         interactive=True,  # Set as interactive, allowing direct editing
                                         elem_classes="env-table",
                                     )
 
                                     # Operation instructions
-                                    gr.Markdown(
+                                    gr.HTML(
                                         """
                                     <div style="background-color: #fff3cd; border-left: 6px solid #ffc107; padding: 10px; margin: 15px 0; border-radius: 4px;">
                                     <strong>Operation Guide</strong>:
@@ -1237,19 +1396,47 @@ def create_ui():
                                     )
 
                     # 连接事件处理函数
+                    # Events touching the .env file and its caches share one
+                    # queue slot, so they never run at the same time
                     save_env_button.click(
                         fn=save_env_table_changes,
                         inputs=[env_table],
                         outputs=[env_status],
-                    ).then(fn=update_env_table, outputs=[env_table])
+                        concurrency_limit=1,
+                        concurrency_id="env_file",
+                        show_progress="hidden",
+                    ).then(
+                        fn=update_env_table,
+                        outputs=[env_table],
+                        concurrency_limit=1,
+                        concurrency_id="env_file",
+                        show_progress="hidden",
+                    )
+
+                    refresh_button.click(
+                        fn=update_env_table,
+                        outputs=[env_table],
+                        concurrency_limit=1,
+                        concurrency_id="env_file",
+                        show_progress="hidden",
+                    )
 
-                    refresh_button.click(fn=update_env_table, outputs=[env_table])
+                    # Fill the table when a client connects
+                    app.load(
+                        fn=update_env_table,
+                        outputs=[env_table],
+                        concurrency_limit=1,
+                        concurrency_id="env_file",
+                        show_progress="hidden",
+                    )
 
         # Set up event handling
         run_button.click(
             fn=process_with_live_logs,
             inputs=[question_input, module_dropdown],
             outputs=[token_count_output, status_output, log_display2],
+            concurrency_limit=1,  # Runs share the log buffer, keep them one at a time
+            show_progress="minimal",
         )
 
         # Module selection updates description
@@ -1257,30 +1444,22 @@ def create_ui():
             fn=update_module_description,
             inputs=module_dropdown,
             outputs=module_description,
+            show_progress="hidden",
         )
 
-        # Conversation record related event handling
+        # Conversation record related event handling, a run streams its own
+        # record as new logs arrive, the button is the manual fallback
         refresh_logs_button2.click(
-            fn=lambda: get_latest_logs(100, LOG_QUEUE), outputs=[log_display2]
-        )
-
-        clear_logs_button2.click(fn=clear_log_file, outputs=[log_display2])
-
-        # Auto refresh control
-        def toggle_auto_refresh(enabled):
-            if enabled:
-                return gr.update(every=3)
-            else:
-                return gr.update(every=0)
-
-        auto_refresh_checkbox2.change(
-            fn=toggle_auto_refresh,
-            inputs=[auto_refresh_checkbox2],
+            fn=lambda: get_latest_logs(100, LOG_BUFFER),
             outputs=[log_display2],
+            show_progress="hidden",
         )
 
-        # No longer automatically refresh logs by default
+        clear_logs_button2.click(
+            fn=clear_log_file, outputs=[log_display2], show_progress="hidden"
+        )
 
+    _APP_SINGLETON = app
     return app
 
 
@@ -1292,34 +1471,20 @@ def main():
         LOG_FILE = setup_logging()
         logging.info("OWL Web application started")
 
-        # Start log reading thread
-        log_thread = threading.Thread(
-            target=log_reader_thread, args=(LOG_FILE,), daemon=True
-        )
-        log_thread.start()
-        logging.info("Log reading thread started")
-
         # Initialize .env file (if it doesn't exist)
         init_env_file()
         app = create_ui()
 
-        app.queue()
-        app.launch(
-            share=False,
-            favicon_path=os.path.join(
-                os.path.dirname(__file__), "assets", "owl-favicon.ico"
-            ),
-        )
+        # UI callbacks are short, let them run concurrently instead of one at a
+        # time, events that modify the .env file keep their own limit of 1
+        app.queue(default_concurrency_limit=10)
+        # Local tool, skip Gradio's server-side rendering pass
+        app.launch(share=False, favicon_path=FAVICON_PATH, ssr_mode=False)
     except Exception as e:
-        logging.error(f"Error occurred while starting the application: {str(e)}")
+        logging.exception("Error occurred while starting the application")
         print(f"Error occurred while starting the application: {str(e)}")
-        import traceback
-
-        traceback.print_exc()
 
     finally:
-        # Ensure log thread stops
-        STOP_LOG_THREAD.set()
         STOP_REQUESTED.set()
         logging.info("Application closed")
 
@@ -11,252 +11,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
-# Import from the correct module path
-from utils import run_society
 import os
-import gradio as gr
+import functools
 from typing import Tuple, List, Dict
 import importlib
 from dotenv import load_dotenv, set_key, find_dotenv, unset_key
 
 os.environ["PYTHONIOENCODING"] = "utf-8"
 
-# Enhanced CSS with navigation bar and additional styling
-custom_css = """
-:root {
-    --primary-color: #4a89dc;
-    --secondary-color: #5d9cec;
-    --accent-color: #7baaf7;
-    --light-bg: #f8f9fa;
-    --border-color: #e4e9f0;
-    --text-muted: #8a9aae;
-}
-
-.container {
-    max-width: 1200px;
-    margin: 0 auto;
-}
-
-.navbar {
-    display: flex;
-    justify-content: space-between;
-    align-items: center;
-    padding: 15px 30px;
-    background: linear-gradient(90deg, var(--primary-color), var(--secondary-color));
-    color: white;
-    border-radius: 10px 10px 0 0;
-    margin-bottom: 0;
-    box-shadow: 0 2px 10px rgba(74, 137, 220, 0.15);
-}
-
-.navbar-logo {
-    display: flex;
-    align-items: center;
-    gap: 10px;
-    font-size: 1.5em;
-    font-weight: bold;
-}
-
-.navbar-menu {
-    display: flex;
-    gap: 20px;
-}
-
-/* Navbar styles moved to a more specific section below */
-
-.header {
-    text-align: center;
-    margin-bottom: 20px;
-    background: linear-gradient(180deg, var(--secondary-color), var(--accent-color));
-    color: white;
-    padding: 40px 20px;
-    border-radius: 0 0 10px 10px;
-    box-shadow: 0 4px 6px rgba(93, 156, 236, 0.12);
-}
-
-.module-info {
-    background-color: var(--light-bg);
-    border-left: 5px solid var(--primary-color);
-    padding: 10px 15px;
-    margin-top: 10px;
-    border-radius: 5px;
-    font-size: 0.9em;
-}
-
-.answer-box {
-    background-color: var(--light-bg);
-    border-left: 5px solid var(--secondary-color);
-    padding: 15px;
-    margin-bottom: 20px;
-    border-radius: 5px;
-    box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);
-}
-
-.token-count {
-    background-color: #e9ecef;
-    padding: 10px;
-    border-radius: 5px;
-    text-align: center;
-    font-weight: bold;
-    margin-bottom: 20px;
-}
-
-.chat-container {
-    border: 1px solid var(--border-color);
-    border-radius: 5px;
-    max-height: 500px;
-    overflow-y: auto;
-    margin-bottom: 20px;
-}
-
-.footer {
-    text-align: center;
-    margin-top: 20px;
-    color: var(--text-muted);
-    font-size: 0.9em;
-    padding: 20px;
-    border-top: 1px solid var(--border-color);
-}
-
-.features-section {
-    display: grid;
-    grid-template-columns: repeat(3, 1fr);
-    gap: 20px;
-    margin: 20px 0;
-}
-
-@media (max-width: 1200px) {
-    .features-section {
-        grid-template-columns: repeat(2, 1fr);
-    }
-}
-
-@media (max-width: 768px) {
-    .features-section {
-        grid-template-columns: 1fr;
-    }
-}
-
-.feature-card {
-    background-color: white;
-    border-radius: 8px;
-    padding: 20px;
-    box-shadow: 0 2px 8px rgba(74, 137, 220, 0.08);
-    transition: transform 0.3s, box-shadow 0.3s;
-    height: 100%;
-    display: flex;
-    flex-direction: column;
-    border: 1px solid rgba(228, 233, 240, 0.6);
-}
-
-.feature-card:hover {
-    transform: translateY(-5px);
-    box-shadow: 0 5px 15px rgba(74, 137, 220, 0.15);
-    border-color: rgba(93, 156, 236, 0.3);
-}
-
-.feature-icon {
-    font-size: 2em;
-    color: var(--primary-color);
-    margin-bottom: 10px;
-    text-shadow: 0 1px 2px rgba(74, 137, 220, 0.1);
-}
-
-.feature-card h3 {
-    margin-top: 10px;
-    margin-bottom: 10px;
-}
-
-.feature-card p {
-    flex-grow: 1;
-    font-size: 0.95em;
-    line-height: 1.5;
-}
-
-/* Navbar link styles - ensuring consistent colors */
-.navbar-menu a {
-    color: #ffffff !important;
-    text-decoration: none;
-    padding: 5px 10px;
-    border-radius: 5px;
-    transition: background-color 0.3s, color 0.3s;
-    font-weight: 500;
-    text-shadow: 0 1px 2px rgba(0, 0, 0, 0.1);
-}
-
-.navbar-menu a:hover {
-    background-color: rgba(255, 255, 255, 0.15);
-    color: #ffffff !important;
-}
-
-/* Improved button and input styles */
-button.primary {
-    background: linear-gradient(90deg, var(--primary-color), var(--secondary-color));
-    transition: all 0.3s;
-}
-
-button.primary:hover {
-    background: linear-gradient(90deg, var(--secondary-color), var(--primary-color));
-    transform: translateY(-2px);
-    box-shadow: 0 4px 8px rgba(0, 0, 0, 0.15);
-}
-
-.env-section {
-    background-color: var(--light-bg);
-    border-radius: 8px;
-    padding: 20px;
-    margin: 20px 0;
-    box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);
-}
-
-.env-table {
-    width: 100%;
-    border-collapse: collapse;
-    margin-top: 15px;
-}
-
-.env-table th, .env-table td {
-    padding: 10px;
-    border: 1px solid var(--border-color);
-}
-
-.env-table th {
-    background-color: var(--primary-color);
-    color: white;
-    text-align: left;
-}
-
-.env-table tr:nth-child(even) {
-    background-color: rgba(0, 0, 0, 0.02);
-}
-
-.env-actions {
-    display: flex;
-    gap: 10px;
-}
-
-.env-var-input {
-    margin-bottom: 15px;
-}
-
-.env-save-status {
-    margin-top: 15px;
-    padding: 10px;
-    border-radius: 5px;
-}
-
-.success {
-    background-color: #d4edda;
-    color: #155724;
-    border: 1px solid #c3e6cb;
-}
-
-.error {
-    background-color: #f8d7da;
-    color: #721c24;
-    border: 1px solid #f5c6cb;
-}
-"""
+# Enhanced CSS with navigation bar and additional styling, served from the assets directory
+CUSTOM_CSS_PATH = os.path.join(os.path.dirname(__file__), "assets", "custom.css")
 
 # Dictionary containing module descriptions
 MODULE_DESCRIPTIONS = {
@@ -314,16 +78,20 @@ def format_chat_history(chat_history: List[Dict[str, str]]) -> List[List[str]]:
         List[List[str]]: 格式化后的聊天历史
     """
     formatted_history = []
+    append = formatted_history.append
     for message in chat_history:
-        user_msg = message.get("user", "")
-        assistant_msg = message.get("assistant", "")
+        user_msg = message.get("user")
+        assistant_msg = message.get("assistant")
 
         if user_msg:
-            formatted_history.append([user_msg, None])
-        if assistant_msg and formatted_history:
-            formatted_history[-1][1] = assistant_msg
+            # 用户消息和助手回复在同一条记录中时一次性添加
+            append([user_msg, assistant_msg or None])
         elif assistant_msg:
-            formatted_history.append([None, assistant_msg])
+            # 单独的助手回复补充到上一条记录
+            if formatted_history:
+                formatted_history[-1][1] = assistant_msg
+            else:
+                append([None, assistant_msg])
 
     return formatted_history
 
@@ -343,6 +111,10 @@ def validate_input(question: str) -> bool:
     return True
 
 
+# run_owl 是否已将.env文件加载到进程环境中
+_ENV_LOADED = False
+
+
 def run_owl(
     question: str, example_module: str
 ) -> Tuple[str, List[List[str]], str, str]:
@@ -355,13 +127,17 @@ def run_owl(
     Returns:
         Tuple[...]: 回答、聊天历史、令牌计数、状态
     """
+    global _ENV_LOADED
+
     # 验证输入
     if not validate_input(question):
         return ("请输入有效的问题", [], "0", "❌ 错误: 输入无效")
 
     try:
-        # 确保环境变量已加载
-        load_dotenv(find_dotenv(), override=True)
+        # 确保环境变量已加载，之后的修改由环境变量管理函数负责重新加载
+        if not _ENV_LOADED:
+            load_dotenv(find_dotenv(), override=True)
+            _ENV_LOADED = True
         # 检查模块是否在MODULE_DESCRIPTIONS中
         if example_module not in MODULE_DESCRIPTIONS:
             return (
@@ -407,6 +183,9 @@ def run_owl(
 
         # 运行社会模拟
         try:
+            # 延迟导入，只有真正运行任务时才加载
+            from utils import run_society
+
             answer, chat_history, token_info = run_society(society)
         except Exception as e:
             return (
@@ -526,6 +305,16 @@ def delete_env_var(key):
         return False, f"删除环境变量时出错: {str(e)}"
 
 
+# 需要掩码的敏感关键词
+SENSITIVE_KEYWORDS = ("key", "token", "secret", "password", "api")
+
+
+@functools.lru_cache(maxsize=256)
+def _is_sensitive(key_lower: str) -> bool:
+    """判断（已转为小写的）环境变量名是否包含敏感关键词，结果按变量名缓存"""
+    return any(keyword in key_lower for keyword in SENSITIVE_KEYWORDS)
+
+
 def mask_sensitive_value(key: str, value: str) -> str:
     """对敏感信息进行掩码处理
 
@@ -536,14 +325,8 @@ def mask_sensitive_value(key: str, value: str) -> str:
     Returns:
         str: 处理后的值
     """
-    # 定义需要掩码的敏感关键词
-    sensitive_keywords = ["key", "token", "secret", "password", "api"]
-
-    # 检查是否包含敏感关键词（不区分大小写）
-    is_sensitive = any(keyword in key.lower() for keyword in sensitive_keywords)
-
-    if is_sensitive and value:
-        # 如果是敏感信息且有值，则显示掩码
+    # 如果是敏感信息且有值，则显示掩码（不区分大小写）
+    if value and _is_sensitive(key.lower()):
         return "*" * 8
     return value
 
@@ -558,7 +341,12 @@ def update_env_table():
 
 def create_ui():
     """创建增强版Gradio界面"""
-    with gr.Blocks(css=custom_css, theme=gr.themes.Soft(primary_hue="blue")) as app:
+    # 延迟导入gradio，仅在构建界面时才需要
+    import gradio as gr
+
+    with gr.Blocks(
+        css_paths=[CUSTOM_CSS_PATH], theme=gr.themes.Soft(primary_hue="blue")
+    ) as app:
         with gr.Column(elem_classes="container"):
             gr.HTML("""
                 <div class="navbar">
@@ -731,34 +519,33 @@ def create_ui():
                     choices=[], label="选择要删除的变量", interactive=True
                 )
 
-                # 更新变量选择器的选项
-                def update_delete_dropdown():
+                # 同时更新变量表格和变量选择器的选项，只读取一次.env文件
+                def refresh_env_ui():
                     env_vars = load_env_vars()
-                    return gr.Dropdown.update(choices=list(env_vars.keys()))
+                    masked_env_vars = [
+                        [k, mask_sensitive_value(k, v)] for k, v in env_vars.items()
+                    ]
+                    return masked_env_vars, gr.update(choices=list(env_vars.keys()))
 
                 # 连接事件处理函数
                 add_env_button.click(
                     fn=lambda k, v: add_env_var(k, v),
                     inputs=[new_env_key, new_env_value],
                     outputs=[env_status],
-                ).then(fn=update_env_table, outputs=[env_table]).then(
-                    fn=update_delete_dropdown, outputs=[env_var_to_delete]
-                ).then(
+                ).then(fn=refresh_env_ui, outputs=[env_table, env_var_to_delete]).then(
                     fn=lambda: ("", ""),  # 修改为返回两个空字符串的元组
                     outputs=[new_env_key, new_env_value],
                 )
 
-                refresh_button.click(fn=update_env_table, outputs=[env_table]).then(
-                    fn=update_delete_dropdown, outputs=[env_var_to_delete]
+                refresh_button.click(
+                    fn=refresh_env_ui, outputs=[env_table, env_var_to_delete]
                 )
 
                 delete_env_button.click(
                     fn=lambda k: delete_env_var(k),
                     inputs=[env_var_to_delete],
                     outputs=[env_status],
-                ).then(fn=update_env_table, outputs=[env_table]).then(
-                    fn=update_delete_dropdown, outputs=[env_var_to_delete]
-                )
+                ).then(fn=refresh_env_ui, outputs=[env_table, env_var_to_delete])
 
             gr.HTML("""
                 <div class="footer" id="about">
@@ -13,18 +13,26 @@
 # ========= Copyright 2023-2024 @ CAMEL-AI.org. All Rights Reserved. =========
 # 正しいモジュールパスからインポート
 from utils import run_society
+from utils.env_file import read_env_file, rewrite_env_file
 import os
 import gradio as gr
 import time
-import json
+import orjson
 import logging
 import datetime
-from typing import Tuple
+import functools
+from typing import Callable, Optional, Tuple
 import importlib
-from dotenv import load_dotenv, set_key, find_dotenv, unset_key
+from dotenv import load_dotenv, find_dotenv
 import threading
-import queue
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
 
 os.environ["PYTHONIOENCODING"] = "utf-8"
 
@@ -74,15 +82,32 @@ def setup_logging():
 
 # グローバル変数
 LOG_FILE = None
-LOG_QUEUE: queue.Queue = queue.Queue()  # ログキュー
+LOG_DEQUE: deque = deque(maxlen=2000)  # 最新のログ行を保持するリングバッファ
+LOG_LOCK = threading.Lock()  # LOG_DEQUEへのアクセスを保護するロック
+LOG_SEQUENCE = 0  # バッファに追加された行数、変更の検出に使用
+LOG_CONDITION = threading.Condition(LOG_LOCK)  # 行が追加されるたびに通知
 STOP_LOG_THREAD = threading.Event()
 CURRENT_PROCESS = None  # 現在実行中のプロセスを追跡するために使用
+# 質問を処理するワーカースレッド、実行はLOG_DEQUEを共有し、clear_log_fileが
+# それを消去するため、一度に1つずつ処理する
+RUN_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="owl-run")
 STOP_REQUESTED = threading.Event()  # 停止が要求されたかどうかをマークするために使用
 
+# 会話記録として扱うログ行の目印
+_LOG_FILTER_MARKER = "camel.agents.chat_agent - INFO"
+# ログ行からユーザーとアシスタントのメッセージを一度の走査で抽出するパターン
+_ROLE_MSG_RE = re.compile(r"\{'role': '(user|assistant)', 'content': '(.*?)'\}")
+# モデルのメッセージ配列、または単独のメッセージのどちらかに一度でマッチするパターン
+_LOG_DISPATCH_RE = re.compile(
+    r"Model .*?, index \d+, processed these messages: (?P<payload>\[.*\])"
+    r"|\{'role': '(?P<role>user|assistant)', 'content': '(?P<content>.*?)'\}"
+)
+
 
 # ログの読み取りと更新の関数
 def log_reader_thread(log_file):
-    """継続的にログファイルを読み取り、新しい行をキューに追加するバックグラウンドスレッド"""
+    """継続的にログファイルを読み取り、新しい会話記録の行をバッファに追加するバックグラウンドスレッド"""
+    global LOG_SEQUENCE
     try:
         with open(log_file, "r", encoding="utf-8") as f:
             # ファイルの末尾に移動
@@ -91,7 +116,12 @@ def log_reader_thread(log_file):
             while not STOP_LOG_THREAD.is_set():
                 line = f.readline()
                 if line:
-                    LOG_QUEUE.put(line)  # 会話記録キューに追加
+                    # 'camel.agents.chat_agent - INFO'を含む行のみを保持
+                    if _LOG_FILTER_MARKER in line:
+                        with LOG_CONDITION:
+                            LOG_DEQUE.append(line)  # 会話記録バッファに追加
+                            LOG_SEQUENCE += 1
+                            LOG_CONDITION.notify_all()
                 else:
                     # 新しい行がない場合は短時間待機
                     time.sleep(0.1)
@@ -99,40 +129,34 @@ def log_reader_thread(log_file):
         logging.error(f"ログリーダースレッドエラー: {str(e)}")
 
 
+def wake_log_waiters(*_args):
+    """ログ行を待っているすべてのループを起こす"""
+    with LOG_CONDITION:
+        LOG_CONDITION.notify_all()
+
+
 def get_latest_logs(max_lines=100, queue_source=None):
-    """キューから最新のログ行を取得するか、キューが空の場合はファイルから直接読み取る
+    """バッファから最新のログ行を取得するか、バッファが足りない場合はファイルから直接読み取る
 
     引数:
         max_lines: 返す最大行数
-        queue_source: 使用するキューを指定、デフォルトはLOG_QUEUE
+        queue_source: 使用するバッファを指定、デフォルトはLOG_DEQUE
 
     戻り値:
         str: ログ内容
     """
-    logs = []
-    log_queue = queue_source if queue_source else LOG_QUEUE
-
-    # 元のキューから削除せずに処理できるように、ログを保存する一時キューを作成
-    temp_queue = queue.Queue()
-    temp_logs = []
-
-    try:
-        # キューから利用可能なすべてのログ行を取得
-        while not log_queue.empty() and len(temp_logs) < max_lines:
-            log = log_queue.get_nowait()
-            temp_logs.append(log)
-            temp_queue.put(log)  # ログを一時キューに戻す
-    except queue.Empty:
-        pass
+    log_buffer = queue_source if queue_source is not None else LOG_DEQUE
 
-    # 会話記録を処理
-    logs = temp_logs
+    # バッファ自体は変更せず、最新の行のスナップショットを取得
+    with LOG_LOCK:
+        logs = list(log_buffer)[-max_lines:]
 
     # 新しいログがないか、十分なログがない場合は、ファイルから直接最後の数行を読み取る
     if len(logs) < max_lines and LOG_FILE and os.path.exists(LOG_FILE):
         try:
             with open(LOG_FILE, "r", encoding="utf-8") as f:
-                all_lines = f.readlines()
+                # バッファと同じく会話記録の行のみを対象にする
+                all_lines = [line for line in f if _LOG_FILTER_MARKER in line]
                 # キューにすでにいくつかのログがある場合は、必要な残りの行だけを読み取る
                 remaining_lines = max_lines - len(logs)
                 file_logs = (
@@ -149,18 +173,8 @@ def get_latest_logs(max_lines=100, queue_source=None):
             if not logs:  # ログがない場合のみエラーメッセージを追加
                 logs = [error_msg]
 
-    # まだログがない場合は、プロンプトメッセージを返す
+    # 会話記録の行がまだない場合は、プロンプトメッセージを返す
     if not logs:
-        return "初期化中..."
-
-    # ログをフィルタリングし、'camel.agents.chat_agent - INFO'を含むログのみを保持
-    filtered_logs = []
-    for log in logs:
-        if "camel.agents.chat_agent - INFO" in log:
-            filtered_logs.append(log)
-
-    # フィルタリング後にログがない場合は、プロンプトメッセージを返す
-    if not filtered_logs:
         return "まだ会話記録はありません。"
 
     # Process log content, extract the latest user and assistant messages
@@ -186,59 +200,39 @@ def get_latest_logs(max_lines=100, queue_source=None):
 
 {content}"""
 
-    for log in filtered_logs:
+    for log in logs:
         formatted_messages = []
-        # Try to extract message array
-        messages_match = re.search(
-            r"Model (.*?), index (\d+), processed these messages: (\[.*\])", log
-        )
-
-        if messages_match:
-            try:
-                messages = json.loads(messages_match.group(3))
-                for msg in messages:
-                    if msg.get("role") in ["user", "assistant"]:
-                        formatted_msg = process_message(
-                            msg.get("role"), msg.get("content", "")
-                        )
-                        if formatted_msg:
-                            formatted_messages.append(formatted_msg)
-            except json.JSONDecodeError:
-                pass
-
-        # If JSON parsing fails or no message array is found, try to extract conversation content directly
-        if not formatted_messages:
-            user_pattern = re.compile(r"\{'role': 'user', 'content': '(.*?)'\}")
-            assistant_pattern = re.compile(
-                r"\{'role': 'assistant', 'content': '(.*?)'\}"
-            )
-
-            for content in user_pattern.findall(log):
-                formatted_msg = process_message("user", content)
-                if formatted_msg:
-                    formatted_messages.append(formatted_msg)
-
-            for content in assistant_pattern.findall(log):
-                formatted_msg = process_message("assistant", content)
+        # Classify each interesting region of the line once: a model message
+        # array or a single user/assistant message
+        for match in _LOG_DISPATCH_RE.finditer(log):
+            payload = match.group("payload")
+            if payload is None:
+                messages = ((match.group("role"), match.group("content")),)
+            else:
+                try:
+                    messages = [
+                        (msg.get("role"), msg.get("content", ""))
+                        for msg in orjson.loads(payload)
+                        if msg.get("role") in ["user", "assistant"]
+                    ]
+                except orjson.JSONDecodeError:
+                    # If JSON parsing fails, extract conversation content directly
+                    messages = _ROLE_MSG_RE.findall(payload)
+
+            for role, content in messages:
+                formatted_msg = process_message(role, content)
                 if formatted_msg:
                     formatted_messages.append(formatted_msg)
 
         if formatted_messages:
             simplified_logs.append("\n\n".join(formatted_messages))
 
-    # Format log output, ensure appropriate separation between each conversation record
-    formatted_logs = []
-    for i, log in enumerate(simplified_logs):
-        # Remove excess whitespace characters from beginning and end
-        log = log.strip()
-
-        formatted_logs.append(log)
-
-        # Ensure each conversation record ends with a newline
-        if not log.endswith("\n"):
-            formatted_logs.append("\n")
+    # フィルタリング後のログに会話メッセージがない場合は、プロンプトメッセージを返す
+    if not simplified_logs:
+        return "まだ会話記録はありません。"
 
-    return "\n".join(formatted_logs)
+    # Format log output, separate each conversation record with a blank line
+    return "\n\n".join(log.strip() for log in simplified_logs)
 
 
 # モジュールの説明を含む辞書
@@ -255,6 +249,9 @@ MODULE_DESCRIPTIONS = {
     "run_together_ai": "together aiモデルを使用してタスクを処理します",
 }
 
+# 選択可能なモジュール名（ドロップダウンの選択肢）
+_MODULE_CHOICES = tuple(MODULE_DESCRIPTIONS)
+
 
 # デフォルトの環境変数テンプレート
 DEFAULT_ENV_TEMPLATE = """#===========================================
@@ -311,6 +308,10 @@ def validate_input(question: str) -> bool:
     return True
 
 
+# 読み込み済みの例モジュールのconstruct_society関数（モジュール名ごと）
+_SOCIETY_BUILDERS: dict[str, Callable] = {}
+
+
 def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
     """OWLシステムを実行して結果を返す
 
@@ -334,7 +335,7 @@ def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
 
     try:
         # Ensure environment variables are loaded
-        load_dotenv(find_dotenv(), override=True)
+        _ensure_env_loaded()
         logging.info(f"質問を処理中: '{question}', モジュール使用: {example_module}")
 
         # Check if the module is in MODULE_DESCRIPTIONS
@@ -348,43 +349,50 @@ def run_owl(question: str, example_module: str) -> Tuple[str, str, str]:
                 "❌ エラー: サポートされていないモジュール",
             )
 
-        # Dynamically import target module
-        module_path = f"examples.{example_module}"
-        try:
-            logging.info(f"モジュールをインポート中: {module_path}")
-            module = importlib.import_module(module_path)
-        except ImportError as ie:
-            logging.error(f"モジュール {module_path} をインポートできません: {str(ie)}")
-            return (
-                f"モジュールをインポートできません: {module_path}",
-                "0",
-                f"❌ エラー: モジュール {example_module} が存在しないか、読み込めません - {str(ie)}",
-            )
-        except Exception as e:
-            logging.error(
-                f"モジュール {module_path} のインポート中にエラーが発生しました: {str(e)}"
-            )
-            return (
-                f"モジュールのインポート中にエラーが発生しました: {module_path}",
-                "0",
-                f"❌ エラー: {str(e)}",
-            )
+        # 読み込み済みモジュールのconstruct_society関数を再利用
+        construct_society = _SOCIETY_BUILDERS.get(example_module)
+        if construct_society is None:
+            # Dynamically import target module
+            module_path = f"examples.{example_module}"
+            try:
+                logging.info(f"モジュールをインポート中: {module_path}")
+                module = importlib.import_module(module_path)
+            except ImportError as ie:
+                logging.error(
+                    f"モジュール {module_path} をインポートできません: {str(ie)}"
+                )
+                return (
+                    f"モジュールをインポートできません: {module_path}",
+                    "0",
+                    f"❌ エラー: モジュール {example_module} が存在しないか、読み込めません - {str(ie)}",
+                )
+            except Exception as e:
+                logging.error(
+                    f"モジュール {module_path} のインポート中にエラーが発生しました: {str(e)}"
+                )
+                return (
+                    f"モジュールのインポート中にエラーが発生しました: {module_path}",
+                    "0",
+                    f"❌ エラー: {str(e)}",
+                )
 
-        # Check if it contains the construct_society function
-        if not hasattr(module, "construct_society"):
-            logging.error(
-                f"construct_society 関数がモジュール {module_path} に見つかりません"
-            )
-            return (
-                f"construct_society 関数がモジュール {module_path} に見つかりません",
-                "0",
-                "❌ エラー: モジュールインターフェースが互換性がありません",
-            )
+            # Check if it contains the construct_society function
+            construct_society = getattr(module, "construct_society", None)
+            if construct_society is None:
+                logging.error(
+                    f"construct_society 関数がモジュール {module_path} に見つかりません"
+                )
+                return (
+                    f"construct_society 関数がモジュール {module_path} に見つかりません",
+                    "0",
+                    "❌ エラー: モジュールインターフェースが互換性がありません",
+                )
+            _SOCIETY_BUILDERS[example_module] = construct_society
 
         # Build society simulation
         try:
             logging.info("社会シミュレーションを構築中...")
-            society = module.construct_society(question)
+            society = construct_society(question)
 
         except Exception as e:
             logging.error(
@@ -442,35 +450,76 @@ def update_module_description(module_name: str) -> str:
 # フロントエンドから設定された環境変数を保存
 WEB_FRONTEND_ENV_VARS: dict[str, str] = {}
 
+# init_env_fileが解決した.envファイルのパス
+_DOTENV_PATH: Optional[str] = None
+
+# run_owlが最後に読み込んだときの.envファイルの更新時刻
+_DOTENV_MTIME: Optional[int] = None
+
+# パスと更新時刻をキーにした.envファイルの解析結果
+_ENV_CACHE = {"mtime": None, "path": None, "vars": None}
+
+
+def invalidate_env_cache():
+    """次回のload_env_vars呼び出しで.envファイルを強制的に再読み込みさせる"""
+    _ENV_CACHE["mtime"] = None
+
 
 def init_env_file():
     """.envファイルが存在しない場合に初期化する"""
+    global _DOTENV_PATH
+    # ファイルが存在する間は解決済みのパスを再利用
+    if _DOTENV_PATH and os.path.isfile(_DOTENV_PATH):
+        return _DOTENV_PATH
+
     dotenv_path = find_dotenv()
     if not dotenv_path:
         with open(".env", "w") as f:
             f.write(DEFAULT_ENV_TEMPLATE)
-        dotenv_path = find_dotenv()
+        # 作成したばかりのファイルなので再検索は不要
+        dotenv_path = os.path.abspath(".env")
+    _DOTENV_PATH = dotenv_path
     return dotenv_path
 
 
+def _ensure_env_loaded():
+    """前回の読み込み以降に.envファイルが変更されていれば、プロセス環境に読み込む"""
+    global _DOTENV_MTIME
+    dotenv_path = init_env_file()
+    try:
+        mtime = os.stat(dotenv_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    if mtime != _DOTENV_MTIME:
+        load_dotenv(dotenv_path, override=True)
+        _DOTENV_MTIME = mtime
+
+
+def _load_env_file_vars(dotenv_path):
+    """.envファイルに定義された変数を辞書で返す
+
+    ファイルが変更されていなければ解析済みの内容を再利用する
+    """
+    mtime = os.stat(dotenv_path).st_mtime_ns
+    if _ENV_CACHE["path"] == dotenv_path and _ENV_CACHE["mtime"] == mtime:
+        env_file_vars = _ENV_CACHE["vars"]
+    else:
+        load_dotenv(dotenv_path, override=True)
+
+        # .envファイルから環境変数を読み込む
+        env_file_vars = read_env_file(dotenv_path)
+
+        _ENV_CACHE.update(path=dotenv_path, mtime=mtime, vars=env_file_vars)
+    return env_file_vars
+
+
 def load_env_vars():
     """環境変数を読み込み、辞書形式で返す
 
     戻り値:
         dict: 環境変数辞書、各値は値とソースを含むタプル（value, source）
     """
-    dotenv_path = init_env_file()
-    load_dotenv(dotenv_path, override=True)
-
-    # .envファイルから環境変数を読み込む
-    env_file_vars = {}
-    with open(dotenv_path, "r") as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#"):
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                    env_file_vars[key.strip()] = value.strip().strip("\"'")
+    env_file_vars = _load_env_file_vars(init_env_file())
 
     # システム環境変数から取得
     system_env_vars = {
@@ -508,19 +557,18 @@ def save_env_vars(env_vars):
     try:
         dotenv_path = init_env_file()
 
-        # Save each environment variable
-        for key, value_data in env_vars.items():
-            if key and key.strip():  # Ensure key is not empty
-                # Handle case where value might be a tuple
-                if isinstance(value_data, tuple):
-                    value = value_data[0]
-                else:
-                    value = value_data
+        # (key, value)の組に正規化、値は（value, source）タプルの場合もある
+        items = [
+            (key.strip(), (value[0] if isinstance(value, tuple) else value).strip())
+            for key, value in env_vars.items()
+            if key and key.strip()  # キーが空でないことを確認
+        ]
 
-                set_key(dotenv_path, key.strip(), value.strip())
-
-        # Reload environment variables to ensure they take effect
-        load_dotenv(dotenv_path, override=True)
+        # すべての環境変数を1回の書き込みで保存し、ファイルが実際に変更された
+        # 場合のみ再読み込みする
+        if rewrite_env_file(dotenv_path, dict(items)):
+            load_dotenv(dotenv_path, override=True)
+            invalidate_env_cache()
 
         return True, "環境変数が正常に保存されました！"
     except Exception as e:
@@ -541,17 +589,27 @@ def add_env_var(key, value, from_frontend=True):
 
         key = key.strip()
         value = value.strip()
+        dotenv_path = init_env_file()
+
+        # 値がすでにどこにでも保存されていれば.envの書き換えをスキップ、
+        # ファイルは副作用のない解析で読み、os.environには触れない
+        if (
+            os.environ.get(key) == value
+            and (not from_frontend or WEB_FRONTEND_ENV_VARS.get(key) == value)
+            and read_env_file(dotenv_path).get(key) == value
+        ):
+            return True, f"環境変数 {key} に変更はありません"
 
         # If from frontend, add to frontend environment variable dictionary
         if from_frontend:
             WEB_FRONTEND_ENV_VARS[key] = value
-            # Directly update system environment variables
-            os.environ[key] = value
 
-        # Also update .env file
-        dotenv_path = init_env_file()
-        set_key(dotenv_path, key, value)
-        load_dotenv(dotenv_path, override=True)
+        # .envファイルも更新
+        rewrite_env_file(dotenv_path, {key: value})
+
+        # Directly update system environment variables instead of re-parsing .env
+        os.environ[key] = value
+        invalidate_env_cache()
 
         return True, f"環境変数 {key} が正常に追加/更新されました！"
     except Exception as e:
@@ -566,9 +624,8 @@ def delete_env_var(key):
 
         key = key.strip()
 
-        # Delete from .env file
-        dotenv_path = init_env_file()
-        unset_key(dotenv_path, key)
+        # .envファイルから削除、変数がなければファイルは書き換えられない
+        rewrite_env_file(init_env_file(), {}, {key})
 
         # Delete from frontend environment variable dictionary
         if key in WEB_FRONTEND_ENV_VARS:
@@ -578,11 +635,51 @@ def delete_env_var(key):
         if key in os.environ:
             del os.environ[key]
 
+        invalidate_env_cache()
         return True, f"環境変数 {key} が正常に削除されました！"
     except Exception as e:
         return False, f"環境変数の削除中にエラーが発生しました: {str(e)}"
 
 
+def _bulk_set_env(updates, deletions):
+    """複数の環境変数の追加・更新・削除を.envへの1回の書き込みで行う
+
+    引数:
+        updates: 変数名から新しい値への辞書
+        deletions: 削除する変数名のセット
+    """
+    rewrite_env_file(init_env_file(), updates, deletions)
+
+    # フロントエンド設定とプロセス環境を同期
+    for key in deletions:
+        WEB_FRONTEND_ENV_VARS.pop(key, None)
+        os.environ.pop(key, None)
+    WEB_FRONTEND_ENV_VARS.update(updates)
+    os.environ.update(updates)
+
+    invalidate_env_cache()
+
+
+# API関連キーワード
+API_KEYWORDS = [
+    "api",
+    "key",
+    "token",
+    "secret",
+    "password",
+    "openai",
+    "qwen",
+    "deepseek",
+    "google",
+    "search",
+    "hf",
+    "hugging",
+    "chunkr",
+    "firecrawl",
+]
+_API_KEYWORD_RE = re.compile("|".join(map(re.escape, API_KEYWORDS)), re.IGNORECASE)
+
+
 def is_api_related(key: str) -> bool:
     """環境変数がAPI関連かどうかを判断
 
@@ -592,54 +689,53 @@ def is_api_related(key: str) -> bool:
     戻り値:
         bool: API関連かどうか
     """
-    # API関連キーワード
-    api_keywords = [
-        "api",
-        "key",
-        "token",
-        "secret",
-        "password",
-        "openai",
-        "qwen",
-        "deepseek",
-        "google",
-        "search",
-        "hf",
-        "hugging",
-        "chunkr",
-        "firecrawl",
-    ]
-
     # API関連キーワードが含まれているか確認（大文字小文字を区別しない）
-    return any(keyword in key.lower() for keyword in api_keywords)
+    return _API_KEYWORD_RE.search(key) is not None
+
+
+# APIキーの取得ガイド、変数名にパターンが最初に一致したエントリを使用
+API_GUIDES = (
+    (re.compile("openai", re.IGNORECASE), "https://platform.openai.com/api-keys"),
+    (
+        re.compile("qwen|dashscope", re.IGNORECASE),
+        "https://help.aliyun.com/zh/model-studio/developer-reference/get-api-key",
+    ),
+    (
+        re.compile("deepseek", re.IGNORECASE),
+        "https://platform.deepseek.com/api_keys",
+    ),
+    (
+        re.compile("google|search_engine_id", re.IGNORECASE),
+        "https://coda.io/@jon-dallas/google-image-search-pack-example/search-engine-id-and-google-api-key-3",
+    ),
+    (re.compile("chunkr", re.IGNORECASE), "https://chunkr.ai/"),
+    (re.compile("firecrawl", re.IGNORECASE), "https://www.firecrawl.dev/"),
+)
+
+
+# 環境変数テーブルに表示するクリック可能なガイドリンク
+GUIDE_LINK_TEMPLATE = "<a href='%s' target='_blank' class='guide-link'>🔗 取得</a>"
+
+# ガイドURLごとに一度だけ生成したリンクHTML
+_GUIDE_LINKS = {url: GUIDE_LINK_TEMPLATE % url for _pattern, url in API_GUIDES}
 
 
+@functools.lru_cache(maxsize=256)
 def get_api_guide(key: str) -> str:
     """環境変数名に基づいて対応するAPIガイドを返す
 
+    変数名はリフレッシュのたびに繰り返し現れるため、結果はキャッシュされる
+
     引数:
         key: 環境変数名
 
     戻り値:
         str: APIガイドリンクまたは説明
     """
-    key_lower = key.lower()
-    if "openai" in key_lower:
-        return "https://platform.openai.com/api-keys"
-    elif "qwen" in key_lower or "dashscope" in key_lower:
-        return "https://help.aliyun.com/zh/model-studio/developer-reference/get-api-key"
-    elif "deepseek" in key_lower:
-        return "https://platform.deepseek.com/api_keys"
-    elif "google" in key_lower:
-        return "https://coda.io/@jon-dallas/google-image-search-pack-example/search-engine-id-and-google-api-key-3"
-    elif "search_engine_id" in key_lower:
-        return "https://coda.io/@jon-dallas/google-image-search-pack-example/search-engine-id-and-google-api-key-3"
-    elif "chunkr" in key_lower:
-        return "https://chunkr.ai/"
-    elif "firecrawl" in key_lower:
-        return "https://www.firecrawl.dev/"
-    else:
-        return ""
+    for pattern, url in API_GUIDES:
+        if pattern.search(key):
+            return url
+    return ""
 
 
 def update_env_table():
@@ -651,13 +747,8 @@ def update_env_table():
     # Format: [Variable name, Variable value, Guide link]
     result = []
     for k, v in api_env_vars.items():
-        guide = get_api_guide(k)
-        # If there's a guide link, create a clickable link
-        guide_link = (
-            f"<a href='{guide}' target='_blank' class='guide-link'>🔗 取得</a>"
-            if guide
-            else ""
-        )
+        # If there's a guide link, use its prebuilt clickable link
+        guide_link = _GUIDE_LINKS.get(get_api_guide(k), "")
         result.append([k, v[0], guide_link])
     return result
 
@@ -677,29 +768,25 @@ def save_env_table_changes(data):
         # Get all current environment variables
         current_env_vars = load_env_vars()
         processed_keys = set()  # Record processed keys to detect deleted variables
+        updates = {}  # Collected changes, written to the .env file in one go
 
         # Process pandas DataFrame object
-        import pandas as pd
-
-        if isinstance(data, pd.DataFrame):
+        if pd is not None and isinstance(data, pd.DataFrame):
             # Get column name information
             columns = data.columns.tolist()
             logging.info(f"DataFrameの列名: {columns}")
 
-            # Iterate through each row of the DataFrame
-            for index, row in data.iterrows():
-                # Use column names to access data
-                if len(columns) >= 3:
-                    # Get variable name and value (column 0 is name, column 1 is value)
-                    key = row[0] if isinstance(row, pd.Series) else row.iloc[0]
-                    value = row[1] if isinstance(row, pd.Series) else row.iloc[1]
-
+            # Iterate through each row of the DataFrame as plain tuples
+            # (column 0 is name, column 1 is value)
+            if len(columns) >= 3:
+                for key, value, *_ in data.itertuples(index=False, name=None):
                     # Check if it's an empty row or deleted variable
                     if (
                         key and str(key).strip()
                     ):  # If key name is not empty, add or update
                         logging.info(f"環境変数の処理: {key} = {value}")
-                        add_env_var(key, str(value))
+                        key = str(key).strip()
+                        updates[key] = str(value).strip()
                         processed_keys.add(key)
         # Process other formats
         elif isinstance(data, dict):
@@ -723,7 +810,8 @@ def save_env_table_changes(data):
                     if isinstance(row, list) and len(row) >= 2:
                         key, value = row[0], row[1]
                         if key and str(key).strip():
-                            add_env_var(key, str(value))
+                            key = str(key).strip()
+                            updates[key] = str(value).strip()
                             processed_keys.add(key)
         elif isinstance(data, list):
             # 列表格式
@@ -731,7 +819,8 @@ def save_env_table_changes(data):
                 if isinstance(row, list) and len(row) >= 2:
                     key, value = row[0], row[1]
                     if key and str(key).strip():
-                        add_env_var(key, str(value))
+                        key = str(key).strip()
+                        updates[key] = str(value).strip()
                         processed_keys.add(key)
         else:
             logging.error(f"不明なデータ形式: {type(data)}")
@@ -744,7 +833,10 @@ def save_env_table_changes(data):
         # Delete variables no longer in the table
         for key in keys_to_delete:
             logging.info(f"環境変数の削除: {key}")
-            delete_env_var(key)
+
+        # Write all additions, updates and deletions with a single .env rewrite
+        if updates or keys_to_delete:
+            _bulk_set_env(updates, keys_to_delete)
 
         return "✅ 環境変数が正常に保存されました"
     except Exception as e:
@@ -780,12 +872,9 @@ def create_ui():
                 # Clear log file content instead of deleting the file
                 open(LOG_FILE, "w").close()
                 logging.info("ログファイルがクリアされました")
-                # Clear log queue
-                while not LOG_QUEUE.empty():
-                    try:
-                        LOG_QUEUE.get_nowait()
-                    except queue.Empty:
-                        break
+                # Clear log buffer
+                with LOG_LOCK:
+                    LOG_DEQUE.clear()
                 return ""
             else:
                 return ""
@@ -801,27 +890,27 @@ def create_ui():
         # Clear log file
         clear_log_file()
 
-        # 質問を処理するバックグラウンドスレッドを作成
-        result_queue = queue.Queue()
-
-        def process_in_background():
-            try:
-                result = run_owl(question, module_name)
-                result_queue.put(result)
-            except Exception as e:
-                result_queue.put(
-                    (f"エラーが発生しました: {str(e)}", "0", f"❌ エラー: {str(e)}")
+        # ワーカースレッドプールで質問の処理を開始
+        future = RUN_EXECUTOR.submit(run_owl, question, module_name)
+        CURRENT_PROCESS = future  # 現在のプロセスを記録
+        # 処理が完了したら待機中のループをすぐに起こす
+        future.add_done_callback(wake_log_waiters)
+
+        # 処理が完了するのを待つ間、新しいログ行が届いたときだけ表示を更新
+        last_sequence = None
+        while not future.done():
+            with LOG_CONDITION:
+                LOG_CONDITION.wait_for(
+                    lambda: LOG_SEQUENCE != last_sequence or future.done(),
+                    timeout=1.0,
                 )
+                sequence = LOG_SEQUENCE
+            if sequence == last_sequence:
+                continue
+            last_sequence = sequence
 
-        # バックグラウンド処理スレッドを開始
-        bg_thread = threading.Thread(target=process_in_background)
-        CURRENT_PROCESS = bg_thread  # 現在のプロセスを記録
-        bg_thread.start()
-
-        # 処理が完了するのを待つ間、1秒ごとにログを更新
-        while bg_thread.is_alive():
             # 会話記録表示を更新
-            logs2 = get_latest_logs(100, LOG_QUEUE)
+            logs2 = get_latest_logs(100, LOG_DEQUE)
 
             # Always update status
             yield (
@@ -830,15 +919,15 @@ def create_ui():
                 logs2,
             )
 
-            time.sleep(1)
-
         # Processing complete, get results
-        if not result_queue.empty():
-            result = result_queue.get()
-            answer, token_count, status = result
+        if not future.cancelled():
+            try:
+                _, token_count, status = future.result()
+            except Exception as e:
+                token_count, status = "0", f"❌ エラー: {str(e)}"
 
             # Final update of conversation record
-            logs2 = get_latest_logs(100, LOG_QUEUE)
+            logs2 = get_latest_logs(100, LOG_DEQUE)
 
             # Set different indicators based on status
             if "エラー" in status:
@@ -852,7 +941,7 @@ def create_ui():
 
             yield token_count, status_with_indicator, logs2
         else:
-            logs2 = get_latest_logs(100, LOG_QUEUE)
+            logs2 = get_latest_logs(100, LOG_DEQUE)
             yield (
                 "0",
                 "<span class='status-indicator status-error'></span> 終了しました",
@@ -1091,7 +1180,7 @@ def create_ui():
                 # Enhanced module selection dropdown
                 # Only includes modules defined in MODULE_DESCRIPTIONS
                 module_dropdown = gr.Dropdown(
-                    choices=list(MODULE_DESCRIPTIONS.keys()),
+                    choices=_MODULE_CHOICES,
                     value="run",
                     label="機能モジュールを選択",
                     interactive=True,
@@ -1253,7 +1342,7 @@ def create_ui():
 
         # Conversation record related event handling
         refresh_logs_button2.click(
-            fn=lambda: get_latest_logs(100, LOG_QUEUE), outputs=[log_display2]
+            fn=lambda: get_latest_logs(100, LOG_DEQUE), outputs=[log_display2]
         )
 
         clear_logs_button2.click(fn=clear_log_file, outputs=[log_display2])
@@ -1313,6 +1402,7 @@ def main():
         # ログスレッドが停止することを確認
         STOP_LOG_THREAD.set()
         STOP_REQUESTED.set()
+        RUN_EXECUTOR.shutdown(wait=False, cancel_futures=True)
         logging.info("アプリケーションが終了しました")
 
 
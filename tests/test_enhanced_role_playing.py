@@ -0,0 +1,194 @@
+"""
+enhanced_role_playing 测试模块
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("camel")
+
+from camel.messages import BaseMessage
+from camel.responses import ChatAgentResponse
+
+from owl.utils.enhanced_role_playing import (
+    OwlResponseCache,
+    arun_society,
+    run_society,
+)
+
+
+def make_response(content, usage=None, terminated=False):
+    """创建模拟的智能体响应"""
+    msg = SimpleNamespace(content=content)
+    info = {"usage": usage} if usage is not None else {}
+    return SimpleNamespace(msg=msg, msgs=[msg], info=info, terminated=terminated)
+
+
+class StubSociety:
+    """按顺序返回预设回合的模拟社会"""
+
+    def __init__(self, rounds):
+        self.rounds = list(rounds)
+
+    def init_chat(self, init_prompt):
+        return SimpleNamespace(content=init_prompt)
+
+    def step(self, input_msg):
+        return self.rounds.pop(0)
+
+    async def astep(self, input_msg):
+        return self.rounds.pop(0)
+
+
+def make_rounds():
+    """两个回合，第二个回合用户发出 TASK_DONE"""
+    return [
+        (
+            make_response(
+                "first answer",
+                {
+                    "completion_tokens": 10,
+                    "prompt_tokens": 100,
+                    "prompt_tokens_details": {"cached_tokens": 40},
+                },
+            ),
+            make_response(
+                "next instruction",
+                {"completion_tokens": 5, "prompt_tokens": 50},
+            ),
+        ),
+        (
+            make_response(
+                "final answer",
+                {
+                    "completion_tokens": 20,
+                    "prompt_tokens": 200,
+                    "cache_read_input_tokens": 80,
+                },
+            ),
+            make_response(
+                "TASK_DONE",
+                {"completion_tokens": 1, "prompt_tokens": 60},
+            ),
+        ),
+    ]
+
+
+EXPECTED_TOKEN_INFO = {
+    "completion_token_count": 10 + 5 + 20 + 1,
+    "prompt_token_count": 100 + 50 + 200 + 60,
+    "cached_prompt_token_count": 40 + 80,
+}
+
+
+def test_arun_society_sums_token_usage():
+    """测试异步运行按角色正确累计令牌数"""
+    answer, chat_history, token_info = asyncio.run(
+        arun_society(StubSociety(make_rounds()))
+    )
+
+    assert answer == "final answer"
+    assert len(chat_history) == 2
+    assert token_info == EXPECTED_TOKEN_INFO
+
+
+def test_arun_society_matches_run_society():
+    """测试异步与同步运行的令牌统计一致"""
+    _, _, sync_info = run_society(StubSociety(make_rounds()))
+    _, _, async_info = asyncio.run(arun_society(StubSociety(make_rounds())))
+
+    assert async_info == sync_info == EXPECTED_TOKEN_INFO
+
+
+class StubAgent:
+    """只提供缓存键所需属性的模拟智能体"""
+
+    def __init__(self, context, model_type="gpt-4o"):
+        self.context = list(context)
+        self.memory = SimpleNamespace(get_context=lambda: (self.context, 0))
+        self.model_backend = SimpleNamespace(model_type=model_type)
+
+
+def make_agent_response(content="answer", terminated=False, info=None):
+    """创建真实的 ChatAgentResponse"""
+    msg = BaseMessage.make_assistant_message(role_name="assistant", content=content)
+    return ChatAgentResponse(msgs=[msg], terminated=terminated, info=info or {})
+
+
+def make_input(content="question"):
+    return BaseMessage.make_user_message(role_name="user", content=content)
+
+
+def test_response_cache_hits_on_identical_context():
+    """测试相同模型、上下文和输入命中缓存"""
+    cache = OwlResponseCache()
+    context = [{"role": "system", "content": "sys"}]
+    response = make_agent_response()
+
+    cache.put(OwlResponseCache.make_key(StubAgent(context), make_input()), response)
+    key = OwlResponseCache.make_key(StubAgent(context), make_input())
+
+    assert cache.get(key) is response
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_response_cache_misses_after_memory_changes():
+    """测试记忆变化、输入变化或模型变化后不再命中"""
+    cache = OwlResponseCache()
+    agent = StubAgent([{"role": "system", "content": "sys"}])
+    cache.put(OwlResponseCache.make_key(agent, make_input()), make_agent_response())
+
+    agent.context.append({"role": "user", "content": "question"})
+    assert cache.get(OwlResponseCache.make_key(agent, make_input())) is None
+
+    other_input = OwlResponseCache.make_key(
+        StubAgent([{"role": "system", "content": "sys"}]), make_input("other")
+    )
+    assert cache.get(other_input) is None
+
+    other_model = OwlResponseCache.make_key(
+        StubAgent([{"role": "system", "content": "sys"}], model_type="gpt-4o-mini"),
+        make_input(),
+    )
+    assert cache.get(other_model) is None
+    assert cache.misses == 3
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        make_agent_response(info={"tool_calls": [{"tool_name": "search"}]}),
+        make_agent_response(terminated=True),
+        ChatAgentResponse(msgs=[], terminated=False, info={}),
+    ],
+    ids=["tool_calls", "terminated", "empty"],
+)
+def test_response_cache_never_stores_uncacheable_responses(response):
+    """测试带工具调用、已终止或空的响应不会被缓存"""
+    cache = OwlResponseCache()
+    key = OwlResponseCache.make_key(StubAgent([]), make_input())
+
+    cache.put(key, response)
+
+    assert cache.get(key) is None
+
+
+def test_response_cache_evicts_least_recently_used():
+    """测试超过容量时淘汰最久未使用的条目"""
+    cache = OwlResponseCache(max_size=2)
+    keys = [
+        OwlResponseCache.make_key(StubAgent([]), make_input(f"q{i}")) for i in range(3)
+    ]
+    responses = [make_agent_response(f"a{i}") for i in range(3)]
+
+    cache.put(keys[0], responses[0])
+    cache.put(keys[1], responses[1])
+    # 访问第一个条目，使第二个条目成为最久未使用
+    assert cache.get(keys[0]) is responses[0]
+    cache.put(keys[2], responses[2])
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is responses[0]
+    assert cache.get(keys[2]) is responses[2]
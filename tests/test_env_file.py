@@ -0,0 +1,144 @@
+"""
+env_file 测试模块
+"""
+
+import os
+import stat
+import threading
+
+import pytest
+
+from owl.utils.env_file import (
+    format_env_line,
+    parse_env,
+    read_env_file,
+    rewrite_env_file,
+)
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (b"PASSWORD=p#ss\n", "p#ss"),
+        (b"URL=http://x/#frag\n", "http://x/#frag"),
+        (b"URL=http://x/#frag # comment\n", "http://x/#frag"),
+        (b"TOKEN=#abc\n", "#abc"),
+        (b"KEY=value   \n", "value"),
+    ],
+)
+def test_parse_env_keeps_hash_inside_values(line, expected):
+    """测试值中的 # 只有在空白之后才被视为注释"""
+    key = line.split(b"=", 1)[0].decode()
+    assert parse_env(line) == {key: expected}
+
+
+def test_parse_env_quoted_values():
+    """测试引号值、转义字符和多行值"""
+    data = b'S=\'a\\\'b\'\nQ="a\\"b # not a comment"\nM="multi\nline"\nexport E=\n'
+    assert parse_env(data) == {
+        "S": "a'b",
+        "Q": 'a"b # not a comment',
+        "M": "multi\nline",
+        "E": "",
+    }
+
+
+def test_parse_env_skips_unterminated_quote():
+    """测试未闭合的引号不会连同引号一起返回"""
+    assert parse_env(b'M="multi\nOTHER=1\n') == {"OTHER": "1"}
+
+
+def test_parse_env_matches_dotenv(tmp_path):
+    """测试解析结果与 python-dotenv 一致"""
+    dotenv = pytest.importorskip("dotenv")
+    path = tmp_path / ".env"
+    path.write_bytes(
+        b"# comment\n"
+        b"PASSWORD=p#ss\n"
+        b"URL=http://x/#frag # comment\n"
+        b"S='it\\'s'\n"
+        b'Q="a\\nb"\n'
+        b"A = b  \n"
+    )
+    assert read_env_file(str(path)) == dotenv.dotenv_values(str(path))
+    # 解析不应修改进程环境变量
+    assert "PASSWORD" not in os.environ
+
+
+def test_rewrite_env_file_updates_and_deletes(tmp_path):
+    """测试批量更新和删除时保留注释及无关的行"""
+    path = tmp_path / ".env"
+    path.write_text(
+        '# comment\nKEEP=1\nOLD="multi\nline" # trailing\nCHANGE=a # note\nLAST=x'
+    )
+
+    assert rewrite_env_file(str(path), {"CHANGE": "p#ss", "NEW": "it's"}, {"OLD"})
+
+    assert path.read_text() == (
+        "# comment\nKEEP=1\nCHANGE='p#ss'\nLAST=x\nNEW='it\\'s'\n"
+    )
+    assert read_env_file(str(path)) == {
+        "KEEP": "1",
+        "CHANGE": "p#ss",
+        "LAST": "x",
+        "NEW": "it's",
+    }
+
+
+def test_rewrite_env_file_skips_unchanged(tmp_path):
+    """测试内容不变时不会重写文件"""
+    path = tmp_path / ".env"
+    path.write_text(format_env_line("KEY", "value"))
+    mtime = path.stat().st_mtime_ns
+
+    assert not rewrite_env_file(str(path), {"KEY": "value"}, {"MISSING"})
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_rewrite_env_file_keeps_equal_values_as_written(tmp_path):
+    """测试值相同但写法不同的变量不会被改写"""
+    path = tmp_path / ".env"
+    path.write_text('A=p#ss # note\nB="x y"\nC=old\n')
+
+    assert not rewrite_env_file(str(path), {"A": "p#ss", "B": "x y"})
+    assert rewrite_env_file(str(path), {"A": "p#ss", "C": "new"})
+
+    assert path.read_text() == "A=p#ss # note\nB=\"x y\"\nC='new'\n"
+
+
+def test_rewrite_env_file_preserves_mode(tmp_path):
+    """测试重写后保留原文件的权限"""
+    path = tmp_path / ".env"
+    path.write_text("KEY=value\n")
+    path.chmod(0o600)
+
+    assert rewrite_env_file(str(path), {"KEY": "other"})
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert os.listdir(tmp_path) == [".env"]
+
+
+def test_rewrite_env_file_concurrent_writers(tmp_path):
+    """测试并发重写不会丢失变量或残留临时文件"""
+    path = tmp_path / ".env"
+    path.write_text("# comment\nORIGINAL=1\n")
+    errors = []
+
+    def writer(index):
+        try:
+            for round_index in range(25):
+                rewrite_env_file(str(path), {f"KEY_{index}_{round_index}": "v"})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    env_vars = read_env_file(str(path))
+    assert env_vars["ORIGINAL"] == "1"
+    assert len(env_vars) == 1 + 4 * 25
+    assert os.listdir(tmp_path) == [".env"]
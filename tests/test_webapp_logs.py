@@ -0,0 +1,74 @@
+"""
+webapp 日志缓冲区测试模块
+"""
+
+import logging
+import os
+import sys
+from collections import deque
+
+import pytest
+
+pytest.importorskip("gradio")
+pytest.importorskip("camel")
+
+# webapp 以 owl 目录作为导入根目录
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "owl"))
+import webapp  # noqa: E402
+
+
+def make_record(message, name="camel.agents.chat_agent"):
+    """创建日志记录"""
+    return logging.LogRecord(name, logging.INFO, __file__, 0, message, None, None)
+
+
+def make_handler(buffer):
+    handler = webapp.LogBufferHandler(buffer)
+    handler.setFormatter(logging.Formatter("%(name)s - %(levelname)s - %(message)s"))
+    return handler
+
+
+def test_log_buffer_handler_keeps_newest_lines():
+    """测试环形缓冲区只保留最新的行并递增序号"""
+    buffer = deque(maxlen=3)
+    handler = make_handler(buffer)
+    sequence = webapp.LOG_SEQUENCE
+
+    for i in range(5):
+        handler.emit(make_record(f"line {i}"))
+
+    assert [line.split(" - ")[-1] for line in buffer] == [
+        "line 2\n",
+        "line 3\n",
+        "line 4\n",
+    ]
+    assert webapp.LOG_SEQUENCE == sequence + 5
+
+
+def test_get_latest_logs_filters_and_deduplicates():
+    """测试只显示对话记录且重复的消息只出现一次"""
+    buffer = deque(maxlen=10)
+    handler = make_handler(buffer)
+    message = (
+        "Model processed these messages: "
+        '[{"role": "user", "content": "hello"}, '
+        '{"role": "assistant", "content": "hi"}]'
+    )
+    handler.emit(make_record("unrelated", name="other"))
+    handler.emit(make_record(message))
+    handler.emit(make_record(message))
+
+    logs = webapp.get_latest_logs(100, buffer)
+
+    assert logs.count("hello") == 1
+    assert logs.count("hi") == 1
+    assert "unrelated" not in logs
+
+
+def test_get_latest_logs_placeholders():
+    """测试缓冲区为空或没有对话记录时的提示信息"""
+    buffer = deque(maxlen=10)
+    assert webapp.get_latest_logs(100, buffer) == "Initialization in progress..."
+
+    make_handler(buffer).emit(make_record("unrelated", name="other"))
+    assert webapp.get_latest_logs(100, buffer) == "No conversation records yet."